@@ -7,9 +7,12 @@ from typing import Any, Callable, Optional, Tuple, List
 from itertools import product
 
 from logic.community_identification.base import CommunityIdentification
+from logic.community_identification.fast_louvain import FastLouvain
 from logic.community_identification.girvan_newman import GirvanNewman
+from logic.community_identification.leiden import Leiden
 from logic.community_identification.label_propagation import LabelPropagation
 from logic.community_identification.louvain import Louvain
+from logic.csr_graph import CSRGraph
 from logic.graph_generation import GraphGeneration
 from logic.metrics import Metrics
 from logic.node_partition import NodePartition
@@ -60,8 +63,9 @@ def process_parameters(
         true_partition: List[Any] = NodePartition.partition_list(
             n_nodes, n_partitions=4, as_set=False)
         elapsed_partition: float = time.time() - start_time
-        graph: Any = GraphGeneration.generate_erdos_p_partition_model(
-            true_partition, p, q)
+        # built once in CSR form, then shared by every algorithm
+        graph: CSRGraph = GraphGeneration.generate_erdos_p_partition_model_fast(
+            true_partition, p, q, csr=True)
         elapsed_graph: float = time.time() - start_time - elapsed_partition
         true_labels: Any = NodePartition.partition_list_to_partition_nodes(
             true_partition, n_nodes)
@@ -130,6 +134,10 @@ def main() -> None:
     algorithms: List[Tuple[str, Callable[[Any, int], Any]]] = [
         ("Louvain", lambda graph, n_parts: CommunityIdentification.project_partition(
             n_parts, Louvain.identification(graph, resolution=1.0))),
+        ("Fast Louvain", lambda graph, n_parts: CommunityIdentification.project_partition(
+            n_parts, FastLouvain.identification(graph, resolution=1.0))),
+        ("Leiden", lambda graph, n_parts: CommunityIdentification.project_partition(
+            n_parts, Leiden.identification(graph, resolution=1.0))),
         ("Label Propagation", lambda graph, n_parts: CommunityIdentification.project_partition(
             n_parts, LabelPropagation.identification(graph))),
         ("Girvan Newman", lambda graph, n_parts: CommunityIdentification.project_partition(
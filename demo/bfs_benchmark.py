@@ -0,0 +1,58 @@
+import time
+from typing import Callable, List, Tuple
+import numpy as np
+
+from logic.bfs import bfs, bfs_distances
+from logic.csr_graph import CSRGraph
+from logic.graph_generation import GraphGeneration
+from logic.node_partition import NodePartition
+
+N_NODES = [
+    int(1e4),
+    int(1e5),
+    int(1e6)
+]
+AVERAGE_DEGREE = 16
+N_PARTITIONS = 4
+N_SOURCES = 5
+
+
+def time_bfs(graph: CSRGraph, run: Callable[[CSRGraph, int], object], sources: List[int]) -> float:
+    start = time.time()
+    for source in sources:
+        run(graph, source)
+    return (time.time() - start) / len(sources)
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    algorithms: List[Tuple[str, Callable[[CSRGraph, int], object]]] = [
+        ("bfs", bfs),
+        ("Top-down", lambda graph, source: bfs_distances(graph, source)),
+        ("Direction-optimizing", lambda graph, source:
+            bfs_distances(graph, source, direction_optimizing=True))
+    ]
+
+    # compile the numba kernel before timing
+    bfs_distances(GraphGeneration.erdos_graph_p_fast(
+        10, 0.5, csr=True), 0, direction_optimizing=True)
+
+    for n_nodes in N_NODES:
+        # 80% of the edges inside the groups
+        group_size = n_nodes / N_PARTITIONS
+        p = 0.8 * AVERAGE_DEGREE / group_size
+        q = 0.2 * AVERAGE_DEGREE / (n_nodes - group_size)
+        partition = NodePartition.partition_list(
+            n_nodes, N_PARTITIONS, as_set=False)
+        graph = GraphGeneration.generate_erdos_p_partition_model_fast(
+            partition, p, q, csr=True, rng=rng)
+        sources = rng.integers(0, n_nodes, size=N_SOURCES).tolist()
+
+        print(f"SBM\t| {n_nodes} Nodes, {graph.n_edges} Edges")
+        for name, algorithm in algorithms:
+            elapsed = time_bfs(graph, algorithm, sources)
+            print(f"\t{name:<24}= {elapsed:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
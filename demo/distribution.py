@@ -1,12 +1,16 @@
 
 import sys
+from logic.csr_graph import CSRGraph, GraphLike
 from logic.degree_distribution import DegreeDistribution
 from logic.graph_generation import GraphGeneration
 import networkx as nx
 
 
-def compute(graph: nx.Graph, num_destinations: int):
-    distribution = DegreeDistribution.distribution(graph, num_destinations)
+def compute(graph: GraphLike, num_destinations: str):
+    if num_destinations == "all":
+        distribution = DegreeDistribution.exact(graph)
+    else:
+        distribution = DegreeDistribution.distribution(graph, int(num_destinations))
 
     print("Degree Distribution:")
     for degree, count in sorted(distribution.items()):
@@ -20,18 +24,20 @@ def test():
     M=500
     print(f"Generate an erdos graph G(n={N}, m={M}) ")
     graph = GraphGeneration.erdos_graph_m(N, M)
-    compute(graph, 10)
+    compute(graph, "10")
 
 
 def main() -> None:
     if len(sys.argv) != 3:
-        print("Usage: python script.py <graph_file> <num_destinations>")
+        print("Usage: python script.py <graph_file> <num_destinations|all>")
         sys.exit(1)
 
-    graph = nx.read_edgelist(sys.argv[1], nodetype=1)
-    num_destinations = int(sys.argv[2])
-
-    compute(graph, num_destinations)
+    # binary CSR files are memory-mapped, text edge lists are parsed
+    if CSRGraph.is_csr_file(sys.argv[1]):
+        graph = sys.argv[1]
+    else:
+        graph = nx.read_edgelist(sys.argv[1], nodetype=int)
+    compute(graph, sys.argv[2])
 
 
 if __name__ == "__main__":
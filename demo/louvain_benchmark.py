@@ -0,0 +1,80 @@
+import time
+from typing import List, Tuple
+import networkx as nx
+import numba
+import numpy as np
+
+from logic.community_identification.fast_louvain import FastLouvain
+from logic.csr_graph import CSRGraph, as_csr
+from logic.graph_generation import GraphGeneration
+from logic.node_partition import NodePartition
+
+N_WORKERS = [1, 2, 4, 8, 16, 32]
+SBM_NODES = int(1e6)
+SBM_PARTITIONS = 100
+AVERAGE_DEGREE = 16
+BA_NODES = int(2e5)
+BA_EDGES_PER_NODE = 5
+
+
+def modularity(graph: CSRGraph, labels: List[int]) -> float:
+    labels = np.asarray(labels)
+    degrees = graph.weighted_degrees()
+    total = degrees.sum()
+    internal = np.count_nonzero(labels[graph.sources()] == labels[graph.indices])
+    return internal / total - float((np.bincount(labels, degrees) ** 2).sum()) / total ** 2
+
+
+def graphs(rng: np.random.Generator) -> List[Tuple[str, CSRGraph]]:
+    # 80% of the edges inside the groups
+    group_size = SBM_NODES / SBM_PARTITIONS
+    p = 0.8 * AVERAGE_DEGREE / group_size
+    q = 0.2 * AVERAGE_DEGREE / (SBM_NODES - group_size)
+    partition = NodePartition.partition_list(SBM_NODES, SBM_PARTITIONS, as_set=False)
+    sbm = GraphGeneration.generate_erdos_p_partition_model_fast(partition, p, q, csr=True, rng=rng)
+    # power-law degrees, where a greedy colouring has a long tail of small colour classes
+    barabasi_albert = as_csr(nx.barabasi_albert_graph(BA_NODES, BA_EDGES_PER_NODE, seed=0))
+    return [("SBM", sbm), ("Barabasi-Albert", barabasi_albert)]
+
+
+def time_first_level(graph: CSRGraph, n_workers: int) -> float:
+    """
+    Time of the parallel local moving of the first level, which is what the workers share.
+    """
+    membership = np.arange(graph.n_nodes, dtype=np.int32)
+    start = time.time()
+    FastLouvain._parallel_local_moving(graph, membership, 1.0, np.random.default_rng(0), n_workers)
+    return time.time() - start
+
+
+def main() -> None:
+    # compile the numba kernels before timing
+    karate = nx.karate_club_graph()
+    FastLouvain.identification(karate, seed=0)
+    FastLouvain.identification(karate, seed=0, n_workers=2)
+
+    print(f"numba threads available: {numba.config.NUMBA_NUM_THREADS}")
+    for name, graph in graphs(np.random.default_rng(0)):
+        print(f"{name}\t| {graph.n_nodes} Nodes, {graph.n_edges} Edges")
+        start = time.time()
+        labels = FastLouvain.identification(graph, seed=0)
+        print(f"\t{'serial':<12}= {time.time() - start:.2f}s\t"
+              f"modularity {modularity(graph, labels):.4f}")
+        one_worker = None
+        for n_workers in N_WORKERS:
+            if n_workers > numba.config.NUMBA_NUM_THREADS:
+                break
+            first_level = time_first_level(graph, n_workers)
+            one_worker = first_level if one_worker is None else one_worker
+            line = f"\t{f'{n_workers} workers':<12}: first level {first_level:.2f}s, " \
+                f"speedup {one_worker / first_level:.2f}"
+            # identification with a single worker is the serial one
+            if n_workers > 1:
+                start = time.time()
+                labels = FastLouvain.identification(graph, seed=0, n_workers=n_workers)
+                line += f"\ttotal {time.time() - start:.2f}s, modularity {modularity(graph, labels):.4f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 from collections import deque
-from typing import Dict, List, Optional, Set
-import networkx as nx
+from typing import Dict, List, Optional, Set, Tuple
+import numba
+import numpy as np
+
+from .csr_graph import CSRGraph, GraphLike, _row_offsets, as_csr
 
 ###################################################################################
 
@@ -23,67 +26,519 @@ def bfs_old(graph: Dict[int, List[int]], start: int = 0) -> Dict[int, int]:
     return distances
 
 
-def bfs(graph: nx.Graph, start_node: int = 0) -> Dict[int, int]:
+def _expand(indptr: np.ndarray, indices: np.ndarray, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Perform a BFS and compute distances from the start_node.
+    Gather the CSR rows of a whole frontier in one vectorized pass.
+
+    Returns:
+        (sources, neighbors): one entry per edge leaving the frontier.
+    """
+    offsets = _row_offsets(indptr, frontier)
+    # only the degrees of the frontier: the whole np.diff(indptr) would make a BFS O(n * depth)
+    return np.repeat(frontier, indptr[frontier + 1] - indptr[frontier]), indices[offsets]
+
+
+def bfs_distances(
+    graph: GraphLike,
+    start_node: int = 0,
+    destinations: Optional[Set[int]] = None,
+    return_parents: bool = False,
+    direction_optimizing: bool = False
+) -> np.ndarray | Tuple[np.ndarray, np.ndarray]:
+    """
+    Level-synchronous BFS over the CSR arrays: each level expands the whole frontier at once.
+    With `direction_optimizing`, levels with a large frontier are expanded bottom-up instead
+    (see `_direction_optimizing_bfs`), which saves most edge checks on small-world graphs.
+    Every level has a constant numpy overhead, which dominates on deep graphs (e.g. long paths):
+    the compiled `direction_optimizing` kernel is then much faster.
+
+    Time Complexity: O(n + m)
 
     Args:
-        graph: A NetworkX graph object.
+        graph: A NetworkX graph, a CSRGraph or the path of a binary CSR file.
         start_node: The starting node for BFS.
+        destinations: Optional set of nodes, the BFS stops at the end of the level where the last
+            of them is reached.
+        return_parents: Whether to also return the BFS tree.
+        direction_optimizing: Whether to switch between top-down and bottom-up expansion.
 
     Returns:
-        A dictionary where each key is a node and the value is the distance from the start_node.
+        An int32 array of distances indexed by node id (see `CSRGraph.nodes`), -1 for the nodes not
+        reached, and if return_parents an int32 array of the parent of each node in the BFS tree
+        (the start is its own parent, -1 for the nodes not reached).
+
+    Example:
+        >>> bfs_distances(nx.path_graph(4), 1)
+        array([1, 0, 1, 2], dtype=int32)
     """
-    distances = {start_node: 0}
-    queue = [start_node]
+    graph = as_csr(graph)
+    targets = None
+    if destinations is not None:
+        targets = np.array([graph.index_of(node) for node in destinations], dtype=np.int64)
+    if direction_optimizing:
+        return _direction_optimizing_bfs(graph, graph.index_of(start_node), targets, return_parents)
+    return _level_bfs(graph, graph.index_of(start_node), targets, return_parents)
 
-    while queue:
-        current = queue.pop(0)
-        for neighbor in graph.neighbors(current):
-            if neighbor not in distances:
-                distances[neighbor] = distances[current] + 1
-                queue.append(neighbor)
 
+def _level_bfs(
+    graph: CSRGraph,
+    start: int,
+    targets: Optional[np.ndarray] = None,
+    return_parents: bool = False
+) -> np.ndarray | Tuple[np.ndarray, np.ndarray]:
+    """
+    `bfs_distances` on node ids, an empty `targets` array means no early exit.
+    """
+    if targets is not None and len(targets) == 0:
+        targets = None
+    distances = np.full(graph.n_nodes, -1, dtype=np.int32)
+    distances[start] = 0
+    parents = None
+    if return_parents:
+        parents = np.full(graph.n_nodes, -1, dtype=np.int32)
+        parents[start] = start
+    stamp = np.empty(graph.n_nodes, dtype=np.int64)
+
+    frontier = np.array([start], dtype=np.int32)
+    level = 0
+    while len(frontier):
+        if targets is not None and np.all(distances[targets] >= 0):
+            break
+        level += 1
+
+        sources, neighbors = _expand(graph.indptr, graph.indices, frontier)
+        fresh = distances[neighbors] < 0
+        sources, neighbors = sources[fresh], neighbors[fresh]
+
+        # keep a single entry per newly discovered node
+        order = np.arange(len(neighbors))
+        stamp[neighbors] = order
+        first = stamp[neighbors] == order
+
+        frontier = neighbors[first]
+        distances[frontier] = level
+        if return_parents:
+            parents[frontier] = sources[first]
+
+    if return_parents:
+        return distances, parents
     return distances
 
 
-def bfs_restricted(
-    graph: nx.Graph, start_node: int = 0, destinations: Optional[Set[int]] = None
-) -> Dict[int, int]:
+###################################################################################
+# DIRECTION-OPTIMIZING BFS
+
+# switch to bottom-up when the frontier has more than 1/ALPHA of the unexplored edges,
+# back to top-down when it has less than 1/BETA of the nodes (Beamer et al.)
+DIRECTION_ALPHA = 14.0
+DIRECTION_BETA = 24.0
+
+
+@numba.njit(cache=True)
+def _direction_optimizing_kernel(
+    indptr: np.ndarray, indices: np.ndarray, start: int, is_target: np.ndarray, n_targets: int,
+    alpha: float, beta: float, distances: np.ndarray, parents: np.ndarray
+) -> None:
+    n_nodes = len(indptr) - 1
+    one = np.uint64(1)
+    visited = np.zeros((n_nodes + 63) // 64, dtype=np.uint64)
+    in_frontier = np.zeros((n_nodes + 63) // 64, dtype=np.uint64)
+    frontier = np.empty(n_nodes, dtype=np.int32)
+    next_frontier = np.empty(n_nodes, dtype=np.int32)
+
+    visited[start >> 6] |= one << np.uint64(start & 63)
+    distances[start] = 0
+    parents[start] = start
+    frontier[0] = start
+    size = 1
+    remaining = n_targets
+    if is_target[start]:
+        remaining -= 1
+    unexplored_edges = len(indices) - (indptr[start + 1] - indptr[start])
+    bottom_up = False
+    level = 0
+
+    while size > 0:
+        if n_targets > 0 and remaining == 0:
+            break
+        level += 1
+
+        frontier_edges = 0
+        for k in range(size):
+            u = frontier[k]
+            frontier_edges += indptr[u + 1] - indptr[u]
+        if not bottom_up and frontier_edges > unexplored_edges / alpha:
+            bottom_up = True
+        elif bottom_up and size < n_nodes / beta:
+            bottom_up = False
+
+        next_size = 0
+        if bottom_up:
+            # every unvisited node looks for a parent in the frontier, stopping at the first one
+            in_frontier[:] = 0
+            for k in range(size):
+                u = frontier[k]
+                in_frontier[u >> 6] |= one << np.uint64(u & 63)
+            for v in range(n_nodes):
+                if visited[v >> 6] & (one << np.uint64(v & 63)):
+                    continue
+                for e in range(indptr[v], indptr[v + 1]):
+                    u = indices[e]
+                    if in_frontier[u >> 6] & (one << np.uint64(u & 63)):
+                        distances[v] = level
+                        parents[v] = u
+                        next_frontier[next_size] = v
+                        next_size += 1
+                        break
+            for k in range(next_size):
+                v = next_frontier[k]
+                visited[v >> 6] |= one << np.uint64(v & 63)
+        else:
+            for k in range(size):
+                u = frontier[k]
+                for e in range(indptr[u], indptr[u + 1]):
+                    v = indices[e]
+                    if not visited[v >> 6] & (one << np.uint64(v & 63)):
+                        visited[v >> 6] |= one << np.uint64(v & 63)
+                        distances[v] = level
+                        parents[v] = u
+                        next_frontier[next_size] = v
+                        next_size += 1
+
+        for k in range(next_size):
+            v = next_frontier[k]
+            unexplored_edges -= indptr[v + 1] - indptr[v]
+            if is_target[v]:
+                remaining -= 1
+        frontier, next_frontier = next_frontier, frontier
+        size = next_size
+
+
+def _direction_optimizing_bfs(
+    graph: CSRGraph,
+    start: int,
+    targets: Optional[np.ndarray] = None,
+    return_parents: bool = False
+) -> np.ndarray | Tuple[np.ndarray, np.ndarray]:
     """
-    Perform a BFS starting from start_node and restrict it to the given destinations if provided.
+    `bfs_distances` on node ids, expanding each level either top-down (the frontier scans its
+    edges) or bottom-up (every unvisited node scans its edges until it finds a frontier node),
+    whichever checks fewer edges, with bitmaps for the visited set and the frontier.
+    """
+    is_target = np.zeros(graph.n_nodes, dtype=np.bool_)
+    n_targets = 0
+    if targets is not None and len(targets):
+        is_target[targets] = True
+        n_targets = int(np.count_nonzero(is_target))
+
+    distances = np.full(graph.n_nodes, -1, dtype=np.int32)
+    parents = np.full(graph.n_nodes, -1, dtype=np.int32)
+    _direction_optimizing_kernel(
+        graph.indptr, graph.indices, start, is_target, n_targets,
+        DIRECTION_ALPHA, DIRECTION_BETA, distances, parents)
+
+    if return_parents:
+        return distances, parents
+    return distances
+
+
+###################################################################################
+# MULTI-SOURCE BFS
+
+@numba.njit(cache=True)
+def _multi_source_kernel(
+    indptr: np.ndarray, indices: np.ndarray, sources: np.ndarray, words: int,
+    eccentricities: np.ndarray, distance_sums: np.ndarray, reached: np.ndarray,
+    histogram: np.ndarray
+) -> int:
+    n_nodes = len(indptr) - 1
+    one = np.uint64(1)
+    batch_size = 64 * words
+    # bit i of word w of a node stands for the source 64 * w + i of the batch
+    seen = np.zeros((n_nodes, words), dtype=np.uint64)
+    visit = np.zeros((n_nodes, words), dtype=np.uint64)
+    visit_next = np.zeros((n_nodes, words), dtype=np.uint64)
+    max_level = 0
+
+    for batch_start in range(0, len(sources), batch_size):
+        batch_end = min(batch_start + batch_size, len(sources))
+        seen[:] = 0
+        visit[:] = 0
+        for i in range(batch_end - batch_start):
+            source = sources[batch_start + i]
+            bit = one << np.uint64(i & 63)
+            seen[source, i >> 6] |= bit
+            visit[source, i >> 6] |= bit
+            reached[batch_start + i] = 1
+        histogram[0] += batch_end - batch_start
+
+        level = 0
+        active = True
+        while active:
+            level += 1
+            visit_next[:] = 0
+            for v in range(n_nodes):
+                any_bits = np.uint64(0)
+                for w in range(words):
+                    any_bits |= visit[v, w]
+                if any_bits == 0:
+                    continue
+                for e in range(indptr[v], indptr[v + 1]):
+                    u = indices[e]
+                    for w in range(words):
+                        visit_next[u, w] |= visit[v, w]
+
+            active = False
+            for u in range(n_nodes):
+                for w in range(words):
+                    new = visit_next[u, w] & ~seen[u, w]
+                    visit[u, w] = new
+                    if new == 0:
+                        continue
+                    active = True
+                    seen[u, w] |= new
+                    while new:
+                        low = new & (~new + one)
+                        i = batch_start + 64 * w + int(np.log2(np.float64(low)))
+                        eccentricities[i] = level
+                        distance_sums[i] += level
+                        reached[i] += 1
+                        histogram[level] += 1
+                        new ^= low
+            if active:
+                max_level = max(max_level, level)
+
+    return max_level
+
+
+def multi_source_bfs(
+    graph: GraphLike,
+    sources: Optional[List[int]] = None,
+    words: int = 1
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bit-parallel multi-source BFS (MS-BFS): 64 * words sources are advanced together, each node
+    holding one bit per source, so a level of the whole batch is a single pass of bitwise ORs
+    over the edges instead of one pass per source.
+
+    Time Complexity: O(n_sources / (64 * words) * D * (n + m) * words)
+    - D: number of levels of a batch, at most the diameter.
 
     Args:
-        graph: A NetworkX graph object.
-        start_node: The starting node for BFS.
-        destinations: An optional set of destination nodes to include in the BFS.
+        graph: A NetworkX graph, a CSRGraph or the path of a binary CSR file.
+        sources: The source nodes, defaults to all nodes.
+        words: Number of uint64 words per node, i.e. sources per batch / 64.
 
     Returns:
-        A dictionary where each key is a node, and the value is another dictionary containing:
-            - 'parent': The parent node in the BFS tree.
-            - 'distance': The distance from the start node.
+        (eccentricities, distance_sums, reached, histogram), the first three aligned with sources:
+            - eccentricities: int32, distance to the farthest node reached.
+            - distance_sums: int64, sum of the distances to the nodes reached (for closeness).
+            - reached: int64, number of nodes reached, the source included.
+            - histogram: int64, histogram[d] is the number of (source, node) pairs at distance d.
     """
-    parent = {start_node: start_node}
-    distance = {start_node: 0}
-    queue = [start_node]
-    visited = {start_node}
+    graph = as_csr(graph)
+    if sources is None:
+        sources = np.arange(graph.n_nodes, dtype=np.int64)
+    else:
+        sources = np.array([graph.index_of(node) for node in sources], dtype=np.int64)
 
-    if destinations is None:
-        destinations = set(graph.nodes)
+    eccentricities = np.zeros(len(sources), dtype=np.int32)
+    distance_sums = np.zeros(len(sources), dtype=np.int64)
+    reached = np.zeros(len(sources), dtype=np.int64)
+    histogram = np.zeros(graph.n_nodes + 1, dtype=np.int64)
+    max_level = _multi_source_kernel(
+        graph.indptr, graph.indices, sources, words,
+        eccentricities, distance_sums, reached, histogram)
+    return eccentricities, distance_sums, reached, histogram[:max_level + 1]
 
-    while queue:
-        current = queue.pop(0)
 
-        if current in destinations:
-            destinations.remove(current)
-            if not destinations:
-                break
+###################################################################################
+# BIDIRECTIONAL BFS
 
-        for neighbor in graph.neighbors(current):
-            if neighbor not in visited:
-                visited.add(neighbor)
-                queue.append(neighbor)
-                parent[neighbor] = current
-                distance[neighbor] = distance[current] + 1
+@numba.njit(cache=True)
+def _bidirectional_level(
+    indptr: np.ndarray, indices: np.ndarray, distances: np.ndarray, other: np.ndarray,
+    parents: np.ndarray, queue: np.ndarray, head: int, tail: int,
+    landmarks: np.ndarray, goal_row: np.ndarray, upper: int, sentinel: int
+) -> Tuple[int, int, int, int]:
+    """
+    Expand the level queue[head:tail] of one side. A node v is pruned when its distance plus the
+    landmark lower bound of d(v, goal) exceeds `upper`: it cannot lie on a shortest path.
+
+    Returns:
+        (head, tail, best, meet): the next level, and the shortest path found through this level
+        with its meeting node, -1 if the sides did not meet.
+    """
+    best, meet = -1, -1
+    end = tail
+    for k in range(head, end):
+        u = queue[k]
+        d = distances[u] + 1
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            if distances[v] >= 0:
+                continue
+            lower = 0
+            for l in range(landmarks.shape[1]):
+                a, b = landmarks[v, l], goal_row[l]
+                if a != sentinel and b != sentinel:
+                    gap = a - b if a > b else b - a
+                    if gap > lower:
+                        lower = gap
+            if d + lower > upper:
+                continue
+            distances[v] = d
+            parents[v] = u
+            queue[tail] = v
+            tail += 1
+            if other[v] >= 0 and (best < 0 or d + other[v] < best):
+                best, meet = d + other[v], v
+    return end, tail, best, meet
+
+
+@numba.njit(cache=True)
+def _bidirectional_kernel(
+    indptr: np.ndarray, indices: np.ndarray, source: int, target: int,
+    landmarks: np.ndarray, source_row: np.ndarray, target_row: np.ndarray, upper: int,
+    sentinel: int, forward: np.ndarray, backward: np.ndarray, forward_parents: np.ndarray,
+    backward_parents: np.ndarray, forward_queue: np.ndarray, backward_queue: np.ndarray
+) -> Tuple[int, int, int, int]:
+    forward[source] = 0
+    forward_parents[source] = source
+    forward_queue[0] = source
+    if source == target:
+        return 0, source, 1, 0
+    backward[target] = 0
+    backward_parents[target] = target
+    backward_queue[0] = target
+    forward_head, forward_tail, backward_head, backward_tail = 0, 1, 0, 1
+
+    while forward_head < forward_tail and backward_head < backward_tail:
+        # expand the smaller frontier, a whole level at a time so that the best meeting is exact
+        if forward_tail - forward_head <= backward_tail - backward_head:
+            forward_head, forward_tail, best, meet = _bidirectional_level(
+                indptr, indices, forward, backward, forward_parents, forward_queue,
+                forward_head, forward_tail, landmarks, target_row, upper, sentinel)
+        else:
+            backward_head, backward_tail, best, meet = _bidirectional_level(
+                indptr, indices, backward, forward, backward_parents, backward_queue,
+                backward_head, backward_tail, landmarks, source_row, upper, sentinel)
+        if best >= 0:
+            return best, meet, forward_tail, backward_tail
+    return -1, -1, forward_tail, backward_tail
+
+
+def _bidirectional_workspace(n_nodes: int) -> Tuple[np.ndarray, ...]:
+    """
+    Scratch arrays of `_bidirectional_search`, reset after each query so they can be reused.
+    """
+    return (np.full(n_nodes, -1, dtype=np.int32), np.full(n_nodes, -1, dtype=np.int32),
+            np.empty(n_nodes, dtype=np.int32), np.empty(n_nodes, dtype=np.int32),
+            np.empty(n_nodes, dtype=np.int32), np.empty(n_nodes, dtype=np.int32))
+
+
+def _bidirectional_search(
+    graph: CSRGraph,
+    source: int,
+    target: int,
+    workspace: Optional[Tuple[np.ndarray, ...]] = None,
+    landmarks: Optional[np.ndarray] = None,
+    upper: int = np.iinfo(np.int32).max
+) -> Tuple[int, np.ndarray]:
+    """
+    `bidirectional_bfs` on node ids, optionally pruned with a landmark distance matrix (see
+    `LandmarkIndex`) and a known upper bound on the distance.
+
+    Returns:
+        (distance, path): -1 and an empty path if target is not reachable.
+    """
+    if workspace is None:
+        workspace = _bidirectional_workspace(graph.n_nodes)
+    if landmarks is None:
+        landmarks = np.zeros((graph.n_nodes, 0), dtype=np.uint8)
+    sentinel = np.iinfo(landmarks.dtype).max
+    forward, backward, forward_parents, backward_parents, forward_queue, backward_queue = workspace
+
+    length, meet, n_forward, n_backward = _bidirectional_kernel(
+        graph.indptr, graph.indices, source, target, landmarks, landmarks[source],
+        landmarks[target], upper, sentinel, *workspace)
+
+    path = []
+    if length >= 0:
+        node = meet
+        while node != source:
+            path.append(node)
+            node = forward_parents[node]
+        path.append(source)
+        path.reverse()
+        node = meet
+        while node != target:
+            node = backward_parents[node]
+            path.append(node)
+
+    forward[forward_queue[:n_forward]] = -1
+    backward[backward_queue[:n_backward]] = -1
+    return length, np.array(path, dtype=np.int64)
+
+
+def bidirectional_bfs(graph: GraphLike, source_node: int, target_node: int) -> Tuple[int, List[int]]:
+    """
+    Shortest path between two nodes by a BFS from both ends, always expanding the smaller
+    frontier, which visits far fewer nodes than a BFS from one side on small-world graphs.
+
+    Args:
+        graph: A NetworkX graph, a CSRGraph or the path of a binary CSR file.
+        source_node: First end of the path.
+        target_node: Second end of the path.
+
+    Returns:
+        (distance, path): the path is the list of nodes from source_node to target_node,
+        -1 and an empty list if they are not connected.
+
+    Example:
+        >>> bidirectional_bfs(nx.path_graph(4), 0, 3)
+        (3, [0, 1, 2, 3])
+    """
+    graph = as_csr(graph)
+    length, path = _bidirectional_search(
+        graph, graph.index_of(source_node), graph.index_of(target_node))
+    return length, [graph.nodes[i] for i in path.tolist()]
+
+
+def _to_dict(graph: CSRGraph, distances: np.ndarray) -> Dict[int, int]:
+    reached = np.flatnonzero(distances >= 0)
+    return {graph.nodes[i]: d for i, d in zip(reached.tolist(), distances[reached].tolist())}
+
+
+def bfs(graph: GraphLike, start_node: int = 0) -> Dict[int, int]:
+    """
+    Perform a BFS and compute distances from the start_node.
+
+    Args:
+        graph: A NetworkX graph or a CSRGraph.
+        start_node: The starting node for BFS.
+
+    Returns:
+        A dictionary where each key is a node and the value is the distance from the start_node.
+    """
+    graph = as_csr(graph)
+    return _to_dict(graph, bfs_distances(graph, start_node))
+
+
+def bfs_restricted(
+    graph: GraphLike, start_node: int = 0, destinations: Optional[Set[int]] = None
+) -> Dict[int, int]:
+    """
+    Perform a BFS starting from start_node and restrict it to the given destinations if provided.
 
-    return distance
+    Args:
+        graph: A NetworkX graph or a CSRGraph.
+        start_node: The starting node for BFS.
+        destinations: An optional set of destination nodes to include in the BFS.
+
+    Returns:
+        A dictionary where each key is a node discovered up to the level of the last destination,
+        and the value is the distance from the start node.
+    """
+    graph = as_csr(graph)
+    return _to_dict(graph, bfs_distances(graph, start_node, destinations))
@@ -0,0 +1,527 @@
+from typing import List, Optional, Sequence, Tuple
+import numba
+import numpy as np
+
+from ..csr_graph import CSRGraph, GraphLike, _row_offsets, as_csr
+
+# smallest modularity gain accepted for a move, so that ties cannot make nodes oscillate
+MIN_GAIN = 1e-12
+# a level stops after a sweep that raised the modularity by less than this
+# (the threshold of the reference implementation of Blondel et al.)
+MIN_IMPROVEMENT = 1e-7
+# colour classes smaller than this are moved serially by the parallel local moving
+PARALLEL_MIN_BATCH = 1024
+
+
+@numba.njit(cache=True)
+def _local_moving_kernel(
+    indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, node_weights: np.ndarray,
+    membership: np.ndarray, community_total: np.ndarray, order: np.ndarray,
+    resolution: float, total: float, max_sweeps: int, min_improvement: float
+) -> int:
+    """
+    Louvain local moving, in place: every node of `order` in turn moves to the neighbouring
+    community of best modularity gain
+        k_i,in(C) - resolution * k_i * tot(C) / 2m
+    until a sweep moves no node or raises the modularity by less than `min_improvement`; the long
+    tail of sweeps moving a handful of nodes would otherwise dominate the running time.
+    The weights from a node to its neighbouring communities are gathered in a scratch array
+    indexed by community, reset through the list of touched entries.
+
+    Returns:
+        The number of moves.
+    """
+    n_nodes = len(indptr) - 1
+    neighbor_weight = np.zeros(n_nodes, dtype=np.float64)
+    seen = np.zeros(n_nodes, dtype=np.bool_)
+    touched = np.empty(n_nodes, dtype=np.int32)
+    n_moves = 0
+
+    for _ in range(max_sweeps):
+        sweep_moves = 0
+        improvement = 0.0
+        for u in order:
+            current = membership[u]
+            n_touched = 0
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                if v == u:
+                    continue
+                c = membership[v]
+                if not seen[c]:
+                    seen[c] = True
+                    touched[n_touched] = c
+                    n_touched += 1
+                neighbor_weight[c] += weights[e]
+
+            k_i = node_weights[u]
+            community_total[current] -= k_i
+            scale = resolution * k_i / total
+            best = current
+            stay_gain = neighbor_weight[current] - scale * community_total[current]
+            best_gain = stay_gain
+            for t in range(n_touched):
+                c = touched[t]
+                gain = neighbor_weight[c] - scale * community_total[c]
+                if gain > best_gain + MIN_GAIN:
+                    best, best_gain = c, gain
+            community_total[best] += k_i
+            if best != current:
+                membership[u] = best
+                sweep_moves += 1
+                improvement += 2 * (best_gain - stay_gain) / total
+
+            for t in range(n_touched):
+                c = touched[t]
+                neighbor_weight[c] = 0.0
+                seen[c] = False
+        n_moves += sweep_moves
+        if sweep_moves == 0 or improvement < min_improvement:
+            break
+    return n_moves
+
+
+@numba.njit(cache=True)
+def _aggregate_kernel(
+    indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, membership: np.ndarray,
+    n_communities: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    CSR arrays of the community graph: the weight between two communities is the sum of the
+    weights of the edges between them. The self-loop of a community weighs its internal edges
+    counted once, so that its degree is the sum of the degrees of its nodes (a loop counts twice).
+    """
+    n_nodes = len(indptr) - 1
+    # nodes grouped by community, by counting sort
+    starts = np.zeros(n_communities + 1, dtype=np.int64)
+    for u in range(n_nodes):
+        starts[membership[u] + 1] += 1
+    for c in range(n_communities):
+        starts[c + 1] += starts[c]
+    members = np.empty(n_nodes, dtype=np.int32)
+    fill = starts[:-1].copy()
+    for u in range(n_nodes):
+        members[fill[membership[u]]] = u
+        fill[membership[u]] += 1
+
+    new_indptr = np.zeros(n_communities + 1, dtype=np.int64)
+    new_indices = np.empty(len(indices), dtype=np.int32)
+    new_weights = np.empty(len(indices), dtype=np.float64)
+    neighbor_weight = np.zeros(n_communities, dtype=np.float64)
+    seen = np.zeros(n_communities, dtype=np.bool_)
+    touched = np.empty(n_communities, dtype=np.int32)
+    nnz = 0
+    for c in range(n_communities):
+        n_touched = 0
+        for k in range(starts[c], starts[c + 1]):
+            u = members[k]
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                d = membership[v]
+                if not seen[d]:
+                    seen[d] = True
+                    touched[n_touched] = d
+                    n_touched += 1
+                # an internal edge u != v is seen from both ends
+                neighbor_weight[d] += weights[e] if v == u or d != c else weights[e] / 2
+        neighbors = np.sort(touched[:n_touched])
+        for d in neighbors:
+            new_indices[nnz] = d
+            new_weights[nnz] = neighbor_weight[d]
+            nnz += 1
+            neighbor_weight[d] = 0.0
+            seen[d] = False
+        new_indptr[c + 1] = nnz
+    return new_indptr, new_indices[:nnz].copy(), new_weights[:nnz].copy()
+
+
+@numba.njit(cache=True)
+def _coloring_kernel(indptr: np.ndarray, indices: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """
+    Greedy colouring in the given node order: every node takes the smallest colour absent from its
+    coloured neighbours, so that nodes of a colour are never adjacent.
+    """
+    n_nodes = len(indptr) - 1
+    colors = np.full(n_nodes, -1, dtype=np.int32)
+    # forbidden[c] == u marks colour c as taken around u
+    forbidden = np.full(n_nodes + 1, -1, dtype=np.int32)
+    for u in order:
+        for e in range(indptr[u], indptr[u + 1]):
+            c = colors[indices[e]]
+            if c >= 0:
+                forbidden[c] = u
+        color = 0
+        while forbidden[color] == u:
+            color += 1
+        colors[u] = color
+    return colors
+
+
+@numba.njit(cache=True)
+def _best_move(
+    u: int, indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, node_weights: np.ndarray,
+    membership: np.ndarray, community_total: np.ndarray, resolution: float, total: float,
+    keys: np.ndarray, values: np.ndarray, used: np.ndarray
+) -> Tuple[int, float, float]:
+    """
+    Best community of node `u` against the current membership and totals, with the weights from
+    `u` to it and to its own community (see `_move_gain`). The weights from `u` to its neighbouring communities are gathered in the
+    open-addressing table (keys, values), of a power of 2 above twice the largest degree slots,
+    instead of an array of n per thread; the table is left empty.
+    """
+    mask = len(keys) - 1
+    current = membership[u]
+    stay_weight = 0.0
+    n_used = 0
+    for e in range(indptr[u], indptr[u + 1]):
+        v = indices[e]
+        if v == u:
+            continue
+        c = membership[v]
+        if c == current:
+            stay_weight += weights[e]
+            continue
+        h = (c * 2654435761) & mask
+        while keys[h] != -1 and keys[h] != c:
+            h = (h + 1) & mask
+        if keys[h] == -1:
+            keys[h] = c
+            used[n_used] = h
+            n_used += 1
+        values[h] += weights[e]
+
+    k_i = node_weights[u]
+    scale = resolution * k_i / total
+    best = current
+    stay_gain = stay_weight - scale * (community_total[current] - k_i)
+    best_gain = stay_gain
+    for t in range(n_used):
+        h = used[t]
+        gain = values[h] - scale * community_total[keys[h]]
+        if gain > best_gain + MIN_GAIN:
+            best, best_gain = keys[h], gain
+        keys[h] = -1
+        values[h] = 0.0
+    best_weight = stay_weight if best == current else best_gain + scale * community_total[best]
+    return best, best_weight, stay_weight
+
+
+@numba.njit(cache=True)
+def _move_gain(
+    u: int, target: int, target_weight: float, stay_weight: float, node_weights: np.ndarray,
+    membership: np.ndarray, community_total: np.ndarray, resolution: float, total: float
+) -> float:
+    """
+    Modularity gain, up to 2 / total, of moving `u` to `target` against the current totals.
+    """
+    k_i = node_weights[u]
+    scale = resolution * k_i / total
+    return (target_weight - scale * community_total[target]) - \
+        (stay_weight - scale * (community_total[membership[u]] - k_i))
+
+
+@numba.njit(parallel=True, cache=True)
+def _parallel_local_moving_kernel(
+    indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray, node_weights: np.ndarray,
+    membership: np.ndarray, community_total: np.ndarray, order: np.ndarray, bounds: np.ndarray,
+    resolution: float, total: float, table_size: int, n_chunks: int, min_batch: int,
+    max_sweeps: int, min_improvement: float
+) -> int:
+    """
+    Local moving over the colour classes order[bounds[k]:bounds[k + 1]], in place, all the sweeps
+    in one launch. The best moves of a class of at least `min_batch` nodes are computed by
+    `n_chunks` parallel chunks against the same membership, then applied; a smaller class is moved
+    node by node, as its parallel region would cost more than it saves. The result does not depend
+    on `n_chunks`.
+
+    The neighbours of a node are not in its class, so its weights to the communities are still
+    exact when the moves are applied, only the totals are outdated: every move is applied only if
+    it still raises the modularity against the updated totals. Otherwise nodes of a class would
+    keep joining and leaving the same community together.
+
+    Returns:
+        The number of moves.
+    """
+    keys = np.full((n_chunks, table_size), -1, dtype=np.int32)
+    values = np.zeros((n_chunks, table_size), dtype=np.float64)
+    used = np.empty((n_chunks, table_size), dtype=np.int32)
+    targets = np.empty(len(order), dtype=np.int32)
+    target_weights = np.empty(len(order), dtype=np.float64)
+    stay_weights = np.empty(len(order), dtype=np.float64)
+    n_moves = 0
+
+    for _ in range(max_sweeps):
+        sweep_moves = 0
+        improvement = 0.0
+        for k in range(len(bounds) - 1):
+            start, end = bounds[k], bounds[k + 1]
+            if end - start >= min_batch:
+                chunk_size = (end - start + n_chunks - 1) // n_chunks
+                for chunk in numba.prange(n_chunks):
+                    for i in range(start + chunk * chunk_size, min(end, start + (chunk + 1) * chunk_size)):
+                        targets[i], target_weights[i], stay_weights[i] = _best_move(
+                            order[i], indptr, indices, weights, node_weights, membership,
+                            community_total, resolution, total, keys[chunk], values[chunk], used[chunk])
+            for i in range(start, end):
+                u = order[i]
+                if end - start < min_batch:
+                    targets[i], target_weights[i], stay_weights[i] = _best_move(
+                        u, indptr, indices, weights, node_weights, membership, community_total,
+                        resolution, total, keys[0], values[0], used[0])
+                target = targets[i]
+                if target == membership[u]:
+                    continue
+                gain = _move_gain(u, target, target_weights[i], stay_weights[i], node_weights,
+                                  membership, community_total, resolution, total)
+                if gain > MIN_GAIN:
+                    community_total[membership[u]] -= node_weights[u]
+                    community_total[target] += node_weights[u]
+                    membership[u] = target
+                    sweep_moves += 1
+                    improvement += 2 * gain / total
+        n_moves += sweep_moves
+        if sweep_moves == 0 or improvement < min_improvement:
+            break
+    return n_moves
+
+
+class FastLouvain:
+    """
+    Array-based Louvain: the partition is an int32 membership array, the community totals a
+    float64 array, and both the local moving and the aggregation are numba kernels over the CSR
+    arrays. The modularity gain uses the usual 2m, the sum of the weighted degrees.
+    """
+
+    @staticmethod
+    def _local_moving(
+        graph: CSRGraph,
+        membership: np.ndarray,
+        resolution: float,
+        rng: np.random.Generator,
+        max_sweeps: int = 1000,
+        min_improvement: float = MIN_IMPROVEMENT,
+        nodes: Optional[np.ndarray] = None
+    ) -> int:
+        """
+        Move the nodes of `graph` between communities in place, visiting them in random order.
+        Only the ids of `nodes` are visited when given, the other nodes keep their community.
+
+        Time Complexity: O(m) per sweep, O(d) with `nodes` (d: sum of their degrees)
+
+        Returns:
+            The number of moves.
+        """
+        node_weights = graph.weighted_degrees()
+        total = float(node_weights.sum())
+        if total == 0:
+            return 0
+        community_total = np.bincount(membership, node_weights, minlength=graph.n_nodes)
+        weights = graph.weights if graph.weights is not None else np.ones(len(graph.indices))
+        order = rng.permutation(graph.n_nodes if nodes is None else nodes).astype(np.int32)
+        return _local_moving_kernel(
+            graph.indptr, graph.indices, weights, node_weights, membership, community_total,
+            order, resolution, total, max_sweeps, min_improvement)
+
+    @staticmethod
+    def _parallel_local_moving(
+        graph: CSRGraph,
+        membership: np.ndarray,
+        resolution: float,
+        rng: np.random.Generator,
+        n_workers: int,
+        max_sweeps: int = 1000,
+        min_improvement: float = MIN_IMPROVEMENT,
+        nodes: Optional[np.ndarray] = None,
+        min_batch: int = PARALLEL_MIN_BATCH
+    ) -> int:
+        """
+        Local moving on `n_workers` threads. The nodes are coloured so that the nodes of a colour
+        share no edge, then every sweep handles the colours in turn: the best moves of the nodes of
+        a colour are computed in parallel against the same membership, then applied together. No
+        two neighbours thus move at once, which keeps the serial quality, while nodes of a colour
+        may still join the same community against slightly outdated totals. The colours of fewer
+        than `min_batch` nodes, the long tail of a greedy colouring of a power-law graph, are moved
+        serially in the same launch (see `_parallel_local_moving_kernel`). As in `_local_moving`,
+        only the ids of `nodes` are visited when given.
+
+        Time Complexity: O(m / n_workers + n_colours) per sweep, O(m) for the colouring
+
+        Returns:
+            The number of moves.
+        """
+        node_weights = graph.weighted_degrees()
+        total = float(node_weights.sum())
+        if total == 0:
+            return 0
+        community_total = np.bincount(membership, node_weights, minlength=graph.n_nodes)
+        weights = graph.weights if graph.weights is not None else np.ones(len(graph.indices))
+        order = rng.permutation(graph.n_nodes if nodes is None else nodes).astype(np.int32)
+        if len(order) == 0:
+            return 0
+        colors = _coloring_kernel(graph.indptr, graph.indices, order)
+        # nodes grouped by colour, in random order inside a colour
+        order = order[np.argsort(colors[order], kind="stable")]
+        bounds = np.searchsorted(colors[order], np.arange(int(colors[order].max()) + 2))
+        table_size = 1 << int(2 * max(int(graph.degrees().max()), 1)).bit_length()
+
+        previous_workers = numba.get_num_threads()
+        numba.set_num_threads(max(1, min(n_workers, numba.config.NUMBA_NUM_THREADS)))
+        try:
+            return _parallel_local_moving_kernel(
+                graph.indptr, graph.indices, weights, node_weights, membership, community_total,
+                order, bounds, resolution, total, table_size, n_workers, min_batch, max_sweeps,
+                min_improvement)
+        finally:
+            numba.set_num_threads(previous_workers)
+
+    @staticmethod
+    def _aggregate(graph: CSRGraph, membership: np.ndarray, n_communities: int) -> CSRGraph:
+        """
+        Merge every community into a single node, numbered by `membership` in [0, n_communities).
+
+        Time Complexity: O(n + m log m)
+        """
+        weights = graph.weights if graph.weights is not None else np.ones(len(graph.indices))
+        return CSRGraph(*_aggregate_kernel(
+            graph.indptr, graph.indices, weights, membership, n_communities))
+
+    @staticmethod
+    def _move(
+        graph: CSRGraph,
+        membership: np.ndarray,
+        resolution: float,
+        rng: np.random.Generator,
+        n_workers: int,
+        nodes: Optional[np.ndarray] = None
+    ) -> int:
+        """
+        Local moving on one thread or on `n_workers` threads.
+
+        Returns:
+            The number of moves.
+        """
+        if n_workers > 1:
+            return FastLouvain._parallel_local_moving(
+                graph, membership, resolution, rng, n_workers, nodes=nodes)
+        return FastLouvain._local_moving(graph, membership, resolution, rng, nodes=nodes)
+
+    @staticmethod
+    def _levels(
+        current: CSRGraph,
+        labels: np.ndarray,
+        resolution: float,
+        rng: np.random.Generator,
+        n_workers: int
+    ) -> List[int]:
+        """
+        Louvain levels from singletons on `current`, until a level moves no node. `labels` gives
+        the node of `current` of every original node.
+
+        Returns:
+            The community of every original node.
+        """
+        while True:
+            membership = np.arange(current.n_nodes, dtype=np.int32)
+            if FastLouvain._move(current, membership, resolution, rng, n_workers) == 0:
+                break
+            communities, membership = np.unique(membership, return_inverse=True)
+            membership = membership.astype(np.int32)
+            labels = membership[labels]
+            current = FastLouvain._aggregate(current, membership, len(communities))
+        return labels.tolist()
+
+    @staticmethod
+    def identification(
+        graph: GraphLike,
+        resolution: float = 1.0,
+        seed: Optional[int] = None,
+        n_workers: int = 1
+    ) -> List[int]:
+        """
+        Perform the Louvain algorithm on the graph and return a list where the i-th element is the community
+        label for node id i. With `n_workers` > 1, the local moving runs on that many threads (see
+        `_parallel_local_moving`), up to the number of numba threads.
+
+        Time Complexity: O(m) per sweep, a few sweeps and O(log n) levels in practice
+
+        Example:
+            Input: graph with 5 nodes, some edges.
+            Output: [0, 0, 1, 1, 0] where each index corresponds to a node.
+        """
+        graph = as_csr(graph)
+        rng = np.random.default_rng(seed)
+        # community of every original node, as a node of the current graph
+        labels = np.arange(graph.n_nodes, dtype=np.int32)
+        current = CSRGraph(graph.indptr, graph.indices, graph.weights)
+        return FastLouvain._levels(current, labels, resolution, rng, n_workers)
+
+    @staticmethod
+    def _warm_start(
+        graph: CSRGraph,
+        previous: Sequence[int],
+        inserted: np.ndarray,
+        deleted: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Initial membership of an incremental update: every node keeps its previous community,
+        except the endpoints of the changed edges, which become singletons, as do the new nodes.
+        A community that lost an internal edge is not reset as a whole: on a 1e5-node planted
+        partition, that made a batch of 100 changes cost half a rerun, for no gain of modularity.
+
+        Returns:
+            (membership, reset): the membership numbered 0..k-1 and the sorted ids of the singletons.
+        """
+        previous = np.asarray(previous, dtype=np.int64)
+        reset = np.union1d(np.concatenate([inserted.ravel(), deleted.ravel()]),
+                           np.arange(len(previous), graph.n_nodes))
+        labels = np.empty(graph.n_nodes, dtype=np.int64)
+        labels[:len(previous)] = previous
+        labels[reset] = previous.max(initial=-1) + 1 + np.arange(len(reset))
+        _, membership = np.unique(labels, return_inverse=True)
+        return membership.astype(np.int32), reset
+
+    @staticmethod
+    def incremental(
+        graph: GraphLike,
+        previous: Sequence[int],
+        inserted: Optional[np.ndarray] = None,
+        deleted: Optional[np.ndarray] = None,
+        resolution: float = 1.0,
+        seed: Optional[int] = None,
+        n_workers: int = 1
+    ) -> List[int]:
+        """
+        Update the communities of an evolving graph after a batch of edge changes, instead of a
+        rerun from singletons. The first level starts from the previous partition, with the
+        affected nodes reset (see `_warm_start`), and only visits them and their neighbours; the
+        other levels run on the small graph of its communities as in `identification`.
+
+        Time Complexity: O(d) per sweep of the first level (d: sum of the degrees of the visited
+        nodes), O(m) for its aggregation, then the upper levels of `identification`
+
+        Args:
+            graph: The graph after the changes, a node keeping its id; the nodes of ids beyond
+                `previous` are new.
+            previous: Community of every node id before the changes, as returned by
+                `identification` or `incremental`.
+            inserted: Array of shape (k, 2) of the node ids of the inserted edges.
+            deleted: Array of shape (k, 2) of the node ids of the deleted edges.
+
+        Example:
+            Input: two cliques found as [0, 0, 0, 1, 1, 1], then the edge (2, 3) deleted.
+            Output: [0, 0, 0, 1, 1, 1]
+        """
+        graph = as_csr(graph)
+        rng = np.random.default_rng(seed)
+        inserted = np.asarray(inserted if inserted is not None else [], dtype=np.int64).reshape(-1, 2)
+        deleted = np.asarray(deleted if deleted is not None else [], dtype=np.int64).reshape(-1, 2)
+        membership, reset = FastLouvain._warm_start(graph, previous, inserted, deleted)
+        # the reset nodes and their neighbours are the only ones whose best move may have changed
+        frontier = np.union1d(reset, graph.indices[_row_offsets(graph.indptr, reset)])
+        FastLouvain._move(graph, membership, resolution, rng, n_workers, nodes=frontier)
+
+        communities, labels = np.unique(membership, return_inverse=True)
+        labels = labels.astype(np.int32)
+        current = FastLouvain._aggregate(
+            CSRGraph(graph.indptr, graph.indices, graph.weights), labels, len(communities))
+        return FastLouvain._levels(current, labels, resolution, rng, n_workers)
@@ -1,6 +1,10 @@
 import networkx as nx
+import numpy as np
 from typing import List, Dict, Tuple, Optional, Set
 
+from ..components import component_members, connected_components, edge_components
+from ..csr_graph import CSRGraph, GraphLike, as_csr
+
 
 class GirvanNewman:
     @staticmethod
@@ -28,46 +32,81 @@ class GirvanNewman:
         return edge_to_remove
 
     @staticmethod
-    def _get_components(graph: nx.Graph) -> List[Set[int]]:
+    def _get_components(graph: GraphLike, edges: Optional[np.ndarray] = None) -> List[Set[int]]:
         """
-        Retrieve connected components of the graph.
+        Retrieve connected components of the graph, by union-find over its CSR edge arrays, or over
+        `edges` (node ids of `graph`, shape (k, 2)) when given, so that the edges left by the
+        removals are used without rebuilding a graph.
 
-        Time Complexity: O(n + m)
+        Time Complexity: O(n + m α(n)), plus O(m log m) to convert a NetworkX graph
         """
-        return list(nx.connected_components(graph))
+        graph = as_csr(graph)
+        nodes = graph.nodes
+        if edges is None:
+            labels, sizes = connected_components(graph)
+        else:
+            labels, sizes = edge_components(graph.n_nodes, [edges])
+        return [{nodes[i] for i in members.tolist()}
+                for members in component_members(labels, sizes)]
 
     @staticmethod
-    def _calculate_modularity(original: nx.Graph, communities: List[Set[int]]) -> float:
+    def _edge_array(graph: CSRGraph) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Calculate the modularity of a partition.
+        Every edge of the graph once, as an int32 array of shape (m, 2) of node ids (u <= v), with
+        the sorted keys u * n + v to find the row of an edge by binary search.
 
         Time Complexity: O(m)
         """
-        m = original.number_of_edges()
+        sources = graph.sources()
+        upper = sources <= graph.indices
+        edges = np.column_stack([sources[upper], graph.indices[upper]]).astype(np.int32)
+        keys = edges[:, 0].astype(np.int64) * graph.n_nodes + edges[:, 1]
+        return edges, keys
+
+    @staticmethod
+    def _calculate_modularity(original: GraphLike, communities: List[Set[int]]) -> float:
+        """
+        Calculate the modularity of a partition.
+
+        Time Complexity: O(n + m)
+        """
+        original = as_csr(original)
+        m = original.n_edges
         if m == 0:
             return 0.0
-        degree = dict(original.degree())
-        Q = 0.0
-        for community in communities:
-            for i in community:
-                for j in community:
-                    A = 1 if original.has_edge(i, j) else 0
-                    Q += A - (degree[i] * degree[j]) / (2 * m)
-        return Q / (2 * m)
+        membership = np.full(original.n_nodes, -1, dtype=np.int64)
+        for label, community in enumerate(communities):
+            membership[[original.index_of(node) for node in community]] = label
+        in_community = membership >= 0
+
+        # sum of A_ij over the pairs (i, j) of a same community
+        source_comm = membership[original.sources()]
+        internal = np.count_nonzero(
+            (source_comm >= 0) & (source_comm == membership[original.indices]))
+        # sum of k_i * k_j over the pairs (i, j) of a same community
+        community_degree = np.bincount(
+            membership[in_community], original.degrees()[in_community], minlength=len(communities))
+        expected = float(np.dot(community_degree, community_degree)) / (2 * m)
+        return (internal - expected) / (2 * m)
 
     @staticmethod
-    def identification(graph: nx.Graph, max_iter: int = 500) -> List[Set[int]]:
+    def identification(graph: GraphLike, max_iter: int = 500) -> List[Set[int]]:
         """
         Identify communities using the Girvan-Newman algorithm.
+        The modularity is computed on the CSR form of the graph, the edge removals on a NetworkX copy.
 
         Time Complexity: O(n * m^2 * k)
         """
-        original_graph = graph.copy()
-        working_graph = graph.copy()
+        original_graph = as_csr(graph)
+        working_graph = graph.copy() if isinstance(
+            graph, nx.Graph) else original_graph.to_networkx()
+        # the edges left by the removals, for the components
+        edges, keys = GirvanNewman._edge_array(original_graph)
+        alive = np.ones(len(edges), dtype=bool)
         best_modularity = -1.0
         best_partition: List[Set[int]] = []
 
-        communities = GirvanNewman._get_components(working_graph)
+        communities = GirvanNewman._get_components(original_graph, edges)
         modularity = GirvanNewman._calculate_modularity(
             original_graph, communities)
         if modularity > best_modularity:
@@ -78,7 +117,9 @@ class GirvanNewman:
             edge = GirvanNewman._remove_highest_betweenness_edge(working_graph)
             if edge is None:
                 break
-            communities = GirvanNewman._get_components(working_graph)
+            u, v = sorted((original_graph.index_of(edge[0]), original_graph.index_of(edge[1])))
+            alive[np.searchsorted(keys, u * original_graph.n_nodes + v)] = False
+            communities = GirvanNewman._get_components(original_graph, edges[alive])
             modularity = GirvanNewman._calculate_modularity(
                 original_graph, communities)
             if modularity > best_modularity:
@@ -3,20 +3,23 @@ from typing import Dict, List
 import networkx as nx
 import collections
 
+from ..csr_graph import CSRGraph, GraphLike, as_csr
+
 
 class LabelPropagation:
     @staticmethod
-    def _init_labels(graph: nx.Graph) -> Dict[int, int]:
+    def _init_labels(graph: GraphLike) -> Dict[int, int]:
         """
         Initialize each node with a unique label.
 
         Time Complexity: O(n)
         - n: number of nodes in the graph.
         """
-        return {node: node for node in graph.nodes()}
+        nodes = graph.nodes if isinstance(graph, CSRGraph) else graph.nodes()
+        return {node: node for node in nodes}
 
     @staticmethod
-    def _propagate_labels(graph: nx.Graph, labels: Dict[int, int]) -> Dict[int, int]:
+    def _propagate_labels(graph: GraphLike, labels: Dict[int, int]) -> Dict[int, int]:
         """
         Update the labels of each node based on the labels of its neighbors.
 
@@ -25,12 +28,15 @@ class LabelPropagation:
           and the total number of neighbor lookups across all nodes is proportional
           to the number of edges.
         """
+        graph = as_csr(graph)
+        nodes = graph.nodes
         new_labels = labels.copy()
-        nodes = list(graph.nodes())
-        random.shuffle(nodes)
-        for node in nodes:
-            neighbor_labels = [new_labels[neighbor]
-                               for neighbor in graph.neighbors(node)]
+        order = list(range(graph.n_nodes))
+        random.shuffle(order)
+        for node_id in order:
+            node = nodes[node_id]
+            neighbor_labels = [new_labels[nodes[neighbor]]
+                               for neighbor in graph.neighbors(node_id).tolist()]
             if neighbor_labels:
                 label_counts = collections.Counter(neighbor_labels)
                 max_count = max(label_counts.values())
@@ -52,7 +58,7 @@ class LabelPropagation:
         return old_labels == new_labels
 
     @staticmethod
-    def identification(graph: nx.Graph, max_iter: int = 100) -> List[int]:
+    def identification(graph: GraphLike, max_iter: int = 100) -> List[int]:
         """
         Perform the Label Propagation Algorithm on the graph and return a list where
         the i-th element is the community label for node i.
@@ -62,16 +68,13 @@ class LabelPropagation:
         - k: number of iterations until convergence, capped at max_iter. Each iteration
           involves O(m) work in _propagate_labels, and the loop runs up to k times.
         """
+        graph = as_csr(graph)
         labels = LabelPropagation._init_labels(graph)
         for _ in range(max_iter):
             new_labels = LabelPropagation._propagate_labels(graph, labels)
             if LabelPropagation._is_converged(labels, new_labels):
                 break
             labels = new_labels
-        n = graph.number_of_nodes()
-        result = [0] * n
         unique_labels = sorted(set(labels.values()))
         label_map = {label: idx for idx, label in enumerate(unique_labels)}
-        for node, label in labels.items():
-            result[node] = label_map[label]
-        return result
+        return [label_map[labels[node]] for node in graph.nodes]
@@ -1,31 +1,40 @@
 import random
-from typing import Dict, List, Tuple
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
 import networkx as nx
+import numpy as np
+import scipy.sparse
+
+from ..csr_graph import CSRGraph, GraphLike, as_csr
+from ..graph_cache import graph_cache
 
 
 class Louvain:
     @staticmethod
-    def _init_partition(graph: nx.Graph) -> Dict[int, int]:
+    def _init_partition(graph: GraphLike) -> Dict[int, int]:
         """
         Time Complexity: O(n)
         """
-        return {node: node for node in graph.nodes()}
+        nodes = graph.nodes if isinstance(graph, CSRGraph) else graph.nodes()
+        return {node: node for node in nodes}
 
     @staticmethod
-    def _compute_degrees(graph: nx.Graph) -> Dict[int, float]:
+    def _compute_degrees(graph: GraphLike) -> Dict[int, float]:
         """
         Compute the weighted degree for each node.
 
-        Time Complexity: O(n)
+        Time Complexity: O(n) the first time, then O(1) (see `graph_cache`)
 
         Example:
             Input: graph with edge (0,1) of weight 2
             Output: {0: 2, 1: 2} (if only one edge exists)
         """
-        return {node: graph.degree(node, weight='weight') for node in graph.nodes()}
+        graph = as_csr(graph)
+        return graph_cache.get(graph, "degree_dict",
+                               lambda: dict(zip(graph.nodes, graph.weighted_degrees().tolist())))
 
     @staticmethod
-    def _get_neighboring_communities(graph: nx.Graph, partition: Dict[int, int], node: int) -> Dict[int, float]:
+    def _get_neighboring_communities(graph: GraphLike, partition: Dict[int, int], node: int) -> Dict[int, float]:
         """
         Compute the total weight of edges from a given node to each neighboring community.
 
@@ -36,30 +45,56 @@ class Louvain:
             Input: node 0 with neighbor 1 in a different community and edge weight 3
             Output: {community_of_1: 3}
         """
+        graph = as_csr(graph)
+        node_id = graph.index_of(node)
+        nodes = graph.nodes
         neighbor_comms: Dict[int, float] = {}
-        for neighbor in graph.neighbors(node):
-            comm = partition[neighbor]
-            weight = graph[node][neighbor].get('weight', 1.0)
+        for neighbor, weight in zip(graph.neighbors(node_id).tolist(),
+                                    graph.neighbor_weights(node_id).tolist()):
+            comm = partition[nodes[neighbor]]
             neighbor_comms[comm] = neighbor_comms.get(comm, 0.0) + weight
         return neighbor_comms
 
     @staticmethod
-    def _one_level(graph: nx.Graph, partition: Dict[int, int], resolution: float) -> Tuple[Dict[int, int], bool]:
+    def _one_level(
+        graph: GraphLike,
+        partition: Dict[int, int],
+        resolution: float,
+        queue: bool = False,
+        min_gain: float = 0.0,
+        max_sweeps: Optional[int] = None,
+        stats: Optional[Dict[str, int]] = None
+    ) -> Tuple[Dict[int, int], bool]:
         """
         Perform one level of the Louvain local optimization.
         Iteratively moves nodes to neighboring communities to maximize modularity.
 
+        By default every sweep visits all the nodes in random order. In queue mode only the first
+        sweep does, then a sweep visits the nodes queued by the previous one: the neighbours of a
+        node that moved, outside its new community, are the only ones whose best move may have
+        changed.
+
         Time Complexity: O(m * log(n))
         - m: number of edges in the graph.
         - n: number of nodes in the graph.
         - The log(n) factor comes from the need to potentially move each node to a different community.
 
+        Args:
+            graph: The graph.
+            partition: Community of every node, updated in place.
+            resolution: Resolution of the modularity.
+            queue: Use the work queue instead of full sweeps.
+            min_gain: The level ends after a sweep raising the modularity by less than this.
+            max_sweeps: Maximum number of sweeps of the level, unlimited by default.
+            stats: If given, "sweeps" and "visits" (nodes visited) are added to its counts, with
+                "full_sweep_visits" (n per sweep) and "saved_visits", the visits saved by the queue.
+
         Example:
             Input: a triangle graph with initial partition {0:0, 1:1, 2:2}
             Output: (updated partition dict, True) if any improvement was made.
         """
-        m = sum(data.get('weight', 1.0)
-                for _, _, data in graph.edges(data=True)) / 2.0
+        graph = as_csr(graph)
+        m = graph.total_weight() / 2.0
         if m == 0:
             return partition, False
         degrees = Louvain._compute_degrees(graph)
@@ -67,13 +102,31 @@ class Louvain:
         for node, comm in partition.items():
             community_total[comm] = community_total.get(
                 comm, 0.0) + degrees[node]
+        labels = graph.nodes
+        pending: Deque = deque()
+        queued: Set = set()
+        if queue:
+            nodes = list(labels)
+            random.shuffle(nodes)
+            pending.extend(nodes)
+            queued.update(nodes)
         improved = False
-        improvement_found = True
-        while improvement_found:
+        sweeps = visits = 0
+        while max_sweeps is None or sweeps < max_sweeps:
+            if queue:
+                if not pending:
+                    break
+                # the nodes queued so far, nodes queued meanwhile wait for the next sweep
+                nodes = (pending.popleft() for _ in range(len(pending)))
+            else:
+                nodes = list(labels)
+                random.shuffle(nodes)
+            sweeps += 1
             improvement_found = False
-            nodes = list(graph.nodes())
-            random.shuffle(nodes)
+            improvement = 0.0
             for node in nodes:
+                queued.discard(node)
+                visits += 1
                 current_comm = partition[node]
                 k_i = degrees[node]
                 neighbor_comms = Louvain._get_neighboring_communities(
@@ -88,47 +141,100 @@ class Louvain:
                         best_delta = delta
                         best_comm = comm
                 if best_comm != current_comm:
+                    stay_delta = neighbor_comms.get(current_comm, 0.0) - resolution * k_i * \
+                        community_total[current_comm] / (2 * m)
+                    improvement += (best_delta - stay_delta) / (2 * m)
                     partition[node] = best_comm
                     community_total[best_comm] = community_total.get(
                         best_comm, 0.0) + k_i
                     improvement_found = True
                     improved = True
+                    if queue:
+                        for neighbor in graph.neighbors(graph.index_of(node)).tolist():
+                            neighbor = labels[neighbor]
+                            if neighbor not in queued and partition[neighbor] != best_comm:
+                                pending.append(neighbor)
+                                queued.add(neighbor)
                 else:
                     community_total[current_comm] += k_i
+            if not improvement_found or improvement < min_gain:
+                break
+
+        if stats is not None:
+            full_sweep_visits = sweeps * graph.n_nodes
+            for key, count in (("sweeps", sweeps), ("visits", visits),
+                               ("full_sweep_visits", full_sweep_visits),
+                               ("saved_visits", full_sweep_visits - visits)):
+                stats[key] = stats.get(key, 0) + count
         return partition, improved
 
     @staticmethod
-    def _aggregate_graph(graph: nx.Graph, partition: Dict[int, int]) -> Tuple[nx.Graph, Dict[int, int]]:
+    def _membership(graph: CSRGraph, partition: Dict[int, int]) -> Tuple[np.ndarray, Dict[int, int]]:
+        """
+        Community of every node id as an int32 array, the communities being renumbered
+        0..k-1 in sorted order by `mapping`.
+
+        Time Complexity: O(n log n)
+        """
+        communities = sorted(set(partition.values()))
+        mapping = {comm: idx for idx, comm in enumerate(communities)}
+        membership = np.array([mapping[partition[node]] for node in graph.nodes], dtype=np.int32)
+        return membership, mapping
+
+    @staticmethod
+    def _aggregate_graph(graph: GraphLike, partition: Dict[int, int]) -> Tuple[GraphLike, Dict[int, int]]:
         """
         Aggregate the graph based on current partition.
         Each community is merged into a single node, and edge weights between communities are summed.
+        The node of community `comm` in the new graph is `mapping[comm]`, the new graph has the same
+        type as the input.
+
+        The community adjacency matrix is the sparse product P^T A P, P being the n x k membership
+        matrix. Its diagonal counts an internal edge u != v twice (A_uv and A_vu) but a self-loop,
+        stored once, only once; the loop of a community weighs its internal edges once, so that its
+        degree (a loop counts twice) is the sum of the degrees of its nodes.
 
-        Time Complexity: O(m)
+        Time Complexity: O(m) for the product, O(n log n) to number the communities
         - m: number of edges in the graph.
 
         Example:
             Input: graph with edge between nodes in the same community.
             Output: new_graph with one node representing that community.
         """
-        new_graph = nx.Graph()
-        for u, v, data in graph.edges(data=True):
-            comm_u = partition[u]
-            comm_v = partition[v]
-            weight = data.get('weight', 1.0)
-            if new_graph.has_edge(comm_u, comm_v):
-                new_graph[comm_u][comm_v]['weight'] += weight
-            else:
-                new_graph.add_edge(comm_u, comm_v, weight=weight)
-        communities = set(partition.values())
-        new_graph.add_nodes_from(communities)
-        mapping = {comm: idx for idx, comm in enumerate(sorted(communities))}
+        csr = as_csr(graph)
+        membership, mapping = Louvain._membership(csr, partition)
+        n_communities = len(mapping)
+
+        adjacency = csr.to_scipy()
+        projection = scipy.sparse.csr_array(
+            (np.ones(csr.n_nodes), (np.arange(csr.n_nodes), membership)),
+            shape=(csr.n_nodes, n_communities))
+        coarse = (projection.T @ adjacency @ projection).tocsr()
+        coarse.sort_indices()
+
+        loops = np.bincount(membership, adjacency.diagonal(), minlength=n_communities)
+        rows = np.repeat(np.arange(n_communities), np.diff(coarse.indptr))
+        diagonal = rows == coarse.indices
+        coarse.data[diagonal] = (coarse.data[diagonal] + loops[rows[diagonal]]) / 2
+
+        new_graph = CSRGraph(coarse.indptr, coarse.indices, coarse.data)
+        if not isinstance(graph, CSRGraph):
+            new_graph = new_graph.to_networkx()
         return new_graph, mapping
 
     @staticmethod
-    def identification(graph: nx.Graph, resolution: float = 1.0) -> List[int]:
+    def identification(
+        graph: GraphLike,
+        resolution: float = 1.0,
+        queue: bool = False,
+        min_gain: float = 0.0,
+        max_sweeps: Optional[int] = None,
+        stats: Optional[Dict[str, int]] = None
+    ) -> List[int]:
         """
         Perform the Louvain algorithm on the graph and return a list where the i-th element is the community
-        label for node i.
+        label for node i. `queue`, `min_gain`, `max_sweeps` and `stats` apply to every level (see `_one_level`),
+        `stats` then sums the counts of all the levels.
 
         Time Complexity: O(m * log(n))
         - m: number of edges in the graph.
@@ -139,34 +245,23 @@ class Louvain:
             Input: graph with 5 nodes, some edges.
             Output: [0, 0, 1, 1, 0] where each index corresponds to a node.
         """
-        node_groups: Dict[int, List[int]] = {
-            node: [node] for node in graph.nodes()}
-        current_graph = graph.copy()
+        graph = as_csr(graph)
+        # community of every original node, as a node id of the current graph
+        labels = np.arange(graph.n_nodes, dtype=np.int32)
+        # work on node ids, the result is indexed by id
+        current_graph = CSRGraph(graph.indptr, graph.indices, graph.weights)
         current_partition = Louvain._init_partition(
             current_graph)
         while True:
             current_partition, improved = Louvain._one_level(
-                current_graph, current_partition, resolution)
+                current_graph, current_partition, resolution, queue, min_gain, max_sweeps, stats)
             if not improved:
                 break
-            new_graph, mapping = Louvain._aggregate_graph(
+            new_graph, _ = Louvain._aggregate_graph(
                 current_graph, current_partition)
-            new_node_groups: Dict[int, List[int]] = {}
-            for node in current_graph.nodes():
-                comm = current_partition[node]
-                new_comm = mapping[comm]
-                if new_comm not in new_node_groups:
-                    new_node_groups[new_comm] = []
-                new_node_groups[new_comm].extend(node_groups[node])
-            node_groups = new_node_groups
+            membership, _ = Louvain._membership(current_graph, current_partition)
+            labels = membership[labels]
             current_graph = new_graph
             current_partition = Louvain._init_partition(
                 current_graph)
-        comm_label: Dict[int, int] = {
-            comm: label for label, comm in enumerate(sorted(node_groups.keys()))}
-        n = graph.number_of_nodes()
-        result: List[int] = [0] * n
-        for comm, nodes in node_groups.items():
-            for node in nodes:
-                result[node] = comm_label[comm]
-        return result
+        return labels.tolist()
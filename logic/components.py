@@ -0,0 +1,117 @@
+from typing import Iterable, List, Tuple
+import numba
+import numpy as np
+
+from .csr_graph import CSRGraph, GraphLike, as_csr
+from .graph_cache import graph_cache
+
+
+@numba.njit(cache=True)
+def _union_kernel(parent: np.ndarray, size: np.ndarray, sources: np.ndarray, targets: np.ndarray) -> None:
+    """
+    Union by size of the ends of every edge, finds compress the paths by halving.
+    """
+    for e in range(len(sources)):
+        u, v = sources[e], targets[e]
+        while parent[u] != u:
+            parent[u] = parent[parent[u]]
+            u = parent[u]
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        if u == v:
+            continue
+        if size[u] < size[v]:
+            u, v = v, u
+        parent[v] = u
+        size[u] += size[v]
+
+
+@numba.njit(cache=True)
+def _label_kernel(parent: np.ndarray, labels: np.ndarray) -> int:
+    """
+    Number the roots in order of their smallest node and label every node with its root.
+
+    Returns:
+        The number of components.
+    """
+    n_components = 0
+    root_label = np.full(len(parent), -1, dtype=np.int32)
+    for u in range(len(parent)):
+        root = u
+        while parent[root] != root:
+            root = parent[root]
+        parent[u] = root
+        if root_label[root] < 0:
+            root_label[root] = n_components
+            n_components += 1
+        labels[u] = root_label[root]
+    return n_components
+
+
+def edge_components(n_nodes: int, chunks: Iterable[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Connected components of the nodes [0, n_nodes) of an edge stream, by union-find: only the
+    parent and size arrays are kept, so edges can come chunk by chunk from a binary edge file
+    (see `GraphIO.read_edge_chunks`).
+
+    Time Complexity: O(n + m α(n))
+
+    Args:
+        n_nodes: Number of nodes.
+        chunks: Arrays of shape (k, 2) of node ids.
+
+    Returns:
+        (labels, sizes): the int32 component of every node, numbered in order of their smallest
+        node, and the int64 number of nodes of every component.
+    """
+    parent = np.arange(n_nodes, dtype=np.int32)
+    size = np.ones(n_nodes, dtype=np.int64)
+    for chunk in chunks:
+        chunk = np.asarray(chunk)
+        if len(chunk):
+            _union_kernel(parent, size, chunk[:, 0], chunk[:, 1])
+
+    labels = np.empty(n_nodes, dtype=np.int32)
+    n_components = _label_kernel(parent, labels)
+    return labels, np.bincount(labels, minlength=n_components).astype(np.int64)
+
+
+def connected_components(graph: GraphLike) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Connected components of a graph by union-find over its CSR edge arrays, cached per graph.
+
+    Time Complexity: O(n + m α(n))
+
+    Args:
+        graph: A NetworkX graph, a CSRGraph or the path of a binary CSR file.
+
+    Returns:
+        (labels, sizes): the int32 component of every node id (see `CSRGraph.nodes`), numbered in
+        order of their smallest node id, and the int64 number of nodes of every component.
+    """
+    graph = as_csr(graph)
+    return graph_cache.get(graph, "components", lambda: _union_find(graph))
+
+
+def _union_find(graph: CSRGraph) -> Tuple[np.ndarray, np.ndarray]:
+    parent = np.arange(graph.n_nodes, dtype=np.int32)
+    size = np.ones(graph.n_nodes, dtype=np.int64)
+    # every edge is stored in both rows, a single direction is enough
+    sources = graph.sources()
+    forward = sources < graph.indices
+    _union_kernel(parent, size, sources[forward], graph.indices[forward])
+
+    labels = np.empty(graph.n_nodes, dtype=np.int32)
+    n_components = _label_kernel(parent, labels)
+    return labels, np.bincount(labels, minlength=n_components).astype(np.int64)
+
+
+def component_members(labels: np.ndarray, sizes: np.ndarray) -> List[np.ndarray]:
+    """
+    Sorted node ids of every component, in the order of the labels.
+    """
+    if len(sizes) == 0:
+        return []
+    order = np.argsort(labels, kind="stable")
+    return np.split(order, np.cumsum(sizes)[:-1])
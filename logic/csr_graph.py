@@ -0,0 +1,350 @@
+import os
+import struct
+from typing import Dict, Hashable, Optional, Sequence, Union
+import networkx as nx
+import numpy as np
+import scipy.sparse
+
+from .graph_cache import graph_cache
+
+# binary format: header, then indptr (<i8), indices (<i4), padding to 8 bytes,
+# optional weights (<f8) and optional original node ids (<i8)
+CSR_MAGIC = b'CSRGRAPH'
+CSR_HEADER = struct.Struct('<8sIIQQ')  # magic, version, flags, n_nodes, nnz
+CSR_VERSION = 1
+CSR_WEIGHTED = 1
+CSR_NODE_IDS = 2
+
+
+class CSRGraph:
+    """
+    Compact undirected graph stored in Compressed Sparse Row form.
+
+    Nodes are the contiguous int32 ids [0, n_nodes). Every undirected edge (u, v) is stored in the
+    rows of both u and v, a self-loop is stored once in its row (same convention as NetworkX).
+    `nodes[i]` is the original node of id i (a `range` when the original nodes are 0..n-1).
+
+    Attributes:
+        indptr: int64 array of size n_nodes + 1, row i spans indices[indptr[i]:indptr[i + 1]].
+        indices: int32 array of neighbor ids, sorted inside each row.
+        weights: float64 array aligned with indices, or None when every edge has weight 1.
+        nodes: original node of each id.
+    """
+
+    def __init__(
+        self,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: Optional[np.ndarray] = None,
+        nodes: Optional[Sequence[Hashable]] = None
+    ) -> None:
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = None if weights is None else np.asarray(
+            weights, dtype=np.float64)
+        self.nodes = range(len(self.indptr) - 1) if nodes is None else nodes
+        self._index: Optional[Dict[Hashable, int]] = None
+
+    ###################################################################################
+
+    @staticmethod
+    def from_edges(
+        n_nodes: int,
+        edges: np.ndarray,
+        weights: Optional[np.ndarray] = None,
+        nodes: Optional[Sequence[Hashable]] = None
+    ) -> "CSRGraph":
+        """
+        Build the graph from an edge array. Duplicated edges are kept once.
+
+        Time Complexity: O(m log m)
+
+        Args:
+            n_nodes: Number of nodes, ids must lie in [0, n_nodes).
+            edges: Array of shape (m, 2) of node ids, each undirected edge given once.
+            weights: Optional array of size m with the weight of each edge.
+            nodes: Optional original node of each id.
+
+        Example:
+            >>> CSRGraph.from_edges(3, np.array([[0, 1], [1, 2]])).indices
+            array([1, 0, 2, 1], dtype=int32)
+        """
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        u, v = edges[:, 0], edges[:, 1]
+        loops = u == v
+        src = np.concatenate([u, v[~loops]])
+        dst = np.concatenate([v, u[~loops]])
+
+        keys = src * n_nodes + dst
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = keys[1:] != keys[:-1]
+        order = order[keep]
+
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            weights = np.concatenate([weights, weights[~loops]])[order]
+
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src[order], minlength=n_nodes),
+                  out=indptr[1:])
+
+        return CSRGraph(indptr, dst[order], weights, nodes)
+
+    @staticmethod
+    def from_networkx(graph: nx.Graph) -> "CSRGraph":
+        """
+        Convert a NetworkX graph. Nodes are sorted when comparable so that a graph on 0..n-1
+        keeps node i as id i. The 'weight' attribute is kept when some edge differs from 1.
+
+        Time Complexity: O(n log n + m log m)
+        """
+        try:
+            nodes = sorted(graph.nodes)
+        except TypeError:
+            nodes = list(graph.nodes)
+        n_nodes = len(nodes)
+
+        if all(isinstance(node, int) for node in nodes) and \
+                (n_nodes == 0 or (nodes[0] == 0 and nodes[-1] == n_nodes - 1)):
+            index = None
+            nodes = range(n_nodes)
+        else:
+            index = {node: i for i, node in enumerate(nodes)}
+
+        m_edges = graph.number_of_edges()
+        edges = np.empty((m_edges, 2), dtype=np.int64)
+        weights = np.empty(m_edges, dtype=np.float64)
+        for k, (u, v, w) in enumerate(graph.edges(data='weight', default=1.0)):
+            if index is None:
+                edges[k] = u, v
+            else:
+                edges[k] = index[u], index[v]
+            weights[k] = w
+
+        if np.all(weights == 1.0):
+            weights = None
+
+        result = CSRGraph.from_edges(n_nodes, edges, weights, nodes)
+        result._index = index
+        return result
+
+    def to_networkx(self) -> nx.Graph:
+        """
+        Time Complexity: O(n + m)
+        """
+        g = nx.Graph()
+        g.add_nodes_from(self.nodes)
+        sources = self.sources()
+        upper = sources <= self.indices
+        u = [self.nodes[i] for i in sources[upper].tolist()]
+        v = [self.nodes[j] for j in self.indices[upper].tolist()]
+        if self.weights is None:
+            g.add_edges_from(zip(u, v))
+        else:
+            g.add_weighted_edges_from(zip(u, v, self.weights[upper].tolist()))
+        return g
+
+    def subgraph(self, node_ids: np.ndarray) -> "CSRGraph":
+        """
+        Subgraph induced by a sorted array of ids, id i of the subgraph being node_ids[i].
+
+        Time Complexity: O(d log k)
+        - d: sum of the degrees of the k selected nodes.
+        """
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        offsets = _row_offsets(self.indptr, node_ids)
+        rows = np.repeat(np.arange(len(node_ids)), self.indptr[node_ids + 1] - self.indptr[node_ids])
+        neighbors = self.indices[offsets]
+        positions = np.searchsorted(node_ids, neighbors)
+        inside = positions < len(node_ids)
+        inside[inside] = node_ids[positions[inside]] == neighbors[inside]
+
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows[inside], minlength=len(node_ids)), out=indptr[1:])
+        weights = None if self.weights is None else self.weights[offsets[inside]]
+        if isinstance(self.nodes, range):
+            nodes = node_ids
+        else:
+            nodes = [self.nodes[i] for i in node_ids.tolist()]
+        return CSRGraph(indptr, positions[inside], weights, nodes)
+
+    def to_scipy(self) -> scipy.sparse.csr_array:
+        """
+        Adjacency matrix sharing the index arrays of the graph (a self-loop is a diagonal entry).
+        """
+        data = np.ones(len(self.indices)) if self.weights is None else self.weights
+        return scipy.sparse.csr_array((data, self.indices, self.indptr),
+                                      shape=(self.n_nodes, self.n_nodes))
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Write the graph in the binary CSR format read by `load`.
+        Original nodes are kept only when they are integers.
+
+        Time Complexity: O(n + m)
+        """
+        node_ids = None
+        if not isinstance(self.nodes, range):
+            node_ids = np.asarray(self.nodes)
+            if node_ids.dtype.kind not in 'iu':
+                raise ValueError("Only integer nodes can be saved")
+
+        flags = (CSR_WEIGHTED if self.weights is not None else 0) | \
+            (CSR_NODE_IDS if node_ids is not None else 0)
+        with open(path, 'wb') as file:
+            file.write(CSR_HEADER.pack(CSR_MAGIC, CSR_VERSION,
+                       flags, self.n_nodes, len(self.indices)))
+            self.indptr.astype('<i8', copy=False).tofile(file)
+            self.indices.astype('<i4', copy=False).tofile(file)
+            file.write(bytes(-file.tell() % 8))
+            if self.weights is not None:
+                self.weights.astype('<f8', copy=False).tofile(file)
+            if node_ids is not None:
+                node_ids.astype('<i8', copy=False).tofile(file)
+
+    @staticmethod
+    def load(path: Union[str, os.PathLike]) -> "CSRGraph":
+        """
+        Map a file written by `save` into memory. The arrays of the graph are read-only views of
+        the file, nothing is read before it is accessed.
+
+        Time Complexity: O(1)
+
+        Raises:
+            ValueError: If the file is not in the binary CSR format.
+        """
+        with open(path, 'rb') as file:
+            magic, version, flags, n_nodes, nnz = CSR_HEADER.unpack(
+                file.read(CSR_HEADER.size))
+        if magic != CSR_MAGIC or version != CSR_VERSION:
+            raise ValueError(f"{path} is not a binary CSR graph")
+
+        def section(dtype: str, count: int, offset: int) -> np.ndarray:
+            if count == 0:
+                return np.empty(0, dtype=dtype)
+            return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+
+        offset = CSR_HEADER.size
+        indptr = section('<i8', n_nodes + 1, offset)
+        offset += 8 * (n_nodes + 1)
+        indices = section('<i4', nnz, offset)
+        offset += 4 * nnz
+        offset += -offset % 8
+        weights = None
+        if flags & CSR_WEIGHTED:
+            weights = section('<f8', nnz, offset)
+            offset += 8 * nnz
+        nodes = None
+        if flags & CSR_NODE_IDS:
+            nodes = section('<i8', n_nodes, offset)
+
+        return CSRGraph(indptr, indices, weights, nodes)
+
+    @staticmethod
+    def is_csr_file(path: Union[str, os.PathLike]) -> bool:
+        with open(path, 'rb') as file:
+            return file.read(len(CSR_MAGIC)) == CSR_MAGIC
+
+    ###################################################################################
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def n_edges(self) -> int:
+        n_loops = int(np.count_nonzero(self.sources() == self.indices))
+        return (len(self.indices) + n_loops) // 2
+
+    def index_of(self, node: Hashable) -> int:
+        """
+        Id of an original node.
+        """
+        if isinstance(self.nodes, range):
+            return node
+        if self._index is None:
+            self._index = {node: i for i, node in enumerate(self.nodes)}
+        return self._index[node]
+
+    def neighbors(self, node_id: int) -> np.ndarray:
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def neighbor_weights(self, node_id: int) -> np.ndarray:
+        start, end = self.indptr[node_id], self.indptr[node_id + 1]
+        if self.weights is None:
+            return np.ones(end - start, dtype=np.float64)
+        return self.weights[start:end]
+
+    def sources(self) -> np.ndarray:
+        """
+        Row id of every entry of `indices`, i.e. the edge array is (sources(), indices).
+        """
+        return np.repeat(np.arange(self.n_nodes, dtype=np.int32), np.diff(self.indptr))
+
+    def degrees(self) -> np.ndarray:
+        """
+        Degree of every node, a self-loop counts twice as in NetworkX.
+
+        Time Complexity: O(n + m) the first time, then O(1) (see `graph_cache`)
+        """
+        def compute() -> np.ndarray:
+            loops = self.sources() == self.indices
+            return np.diff(self.indptr) + np.bincount(self.indices[loops], minlength=self.n_nodes)
+        return graph_cache.get(self, "degrees", compute)
+
+    def weighted_degrees(self) -> np.ndarray:
+        """
+        Sum of the incident edge weights of every node, a self-loop counts twice.
+
+        Time Complexity: O(n + m) the first time, then O(1) (see `graph_cache`)
+        """
+        def compute() -> np.ndarray:
+            if self.weights is None:
+                return self.degrees().astype(np.float64)
+            sources = self.sources()
+            loops = sources == self.indices
+            return np.bincount(sources, self.weights, minlength=self.n_nodes) + \
+                np.bincount(sources[loops], self.weights[loops], minlength=self.n_nodes)
+        return graph_cache.get(self, "weighted_degrees", compute)
+
+    def total_weight(self) -> float:
+        """
+        Sum of the weights of the edges, each undirected edge counted once.
+        """
+        return graph_cache.get(self, "total_weight", lambda: float(self.weighted_degrees().sum()) / 2.0)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the arrays of the graph.
+        """
+        arrays = (self.indptr, self.indices, self.weights, self.nodes)
+        return sum(array.nbytes for array in arrays if isinstance(array, np.ndarray))
+
+
+def _row_offsets(indptr: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """
+    Positions in `indices` of all the entries of the given rows, gathered in one vectorized pass.
+    """
+    starts = indptr[rows]
+    counts = indptr[np.asarray(rows) + 1] - starts
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+
+GraphLike = Union[nx.Graph, CSRGraph, str, os.PathLike]
+
+
+def as_csr(graph: GraphLike) -> CSRGraph:
+    """
+    Return the graph in CSR form, converting a NetworkX graph (O(m log m), on every call: the
+    conversion is not cached since the graph may have changed), memory-mapping the path of a
+    binary CSR file (O(1)) and returning a CSRGraph as is, so that callers convert once and reuse
+    the result.
+    """
+    if isinstance(graph, CSRGraph):
+        return graph
+    if isinstance(graph, (str, os.PathLike)):
+        return CSRGraph.load(graph)
+    return CSRGraph.from_networkx(graph)
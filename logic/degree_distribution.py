@@ -1,42 +1,296 @@
 import matplotlib.pyplot as plt
-from collections import defaultdict
 import random
-from typing import Dict
-import networkx as nx
-import sys
+from statistics import NormalDist
+from typing import Dict, Generator, Optional, Tuple
+import numpy as np
 
-from .bfs import bfs_restricted
-from .graph_generation import GraphGeneration
+from .bfs import _expand, _level_bfs
+from .csr_graph import CSRGraph, GraphLike, _row_offsets, as_csr
+from .graph_io import GraphIO
+
+
+def _histogram_dict(degree_count: np.ndarray) -> Dict[int, int]:
+    return {degree: count for degree, count in enumerate(degree_count.tolist()) if count}
+
+###################################################################################
+# SAMPLING
+
+# steps discarded by every walker before its visits are recorded
+WALK_BURN_IN = 50
+N_WALKERS = 32
+
+# a sample is (ids, degrees, weights, batches): every sampled node, its degree, its weight in the
+# ratio estimator (1 / probability of being sampled, up to a constant) and its batch label
+Sample = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def _node_degrees(graph: CSRGraph, ids: np.ndarray) -> np.ndarray:
+    """
+    Degrees of the given nodes only, a self-loop counts twice, without computing all degrees.
+    """
+    lengths = graph.indptr[ids + 1] - graph.indptr[ids]
+    owners = np.repeat(np.arange(len(ids)), lengths)
+    loops = graph.indices[_row_offsets(graph.indptr, ids)] == ids[owners]
+    return lengths + np.bincount(owners[loops], minlength=len(ids))
+
+
+def _random_non_isolated(graph: CSRGraph, rng: np.random.Generator, size: int) -> np.ndarray:
+    """
+    Uniform nodes among those with at least one edge, by rejection.
+    """
+    found = np.empty(0, dtype=np.int64)
+    while len(found) < size:
+        ids = rng.integers(graph.n_nodes, size=2 * size)
+        found = np.concatenate([found, ids[graph.indptr[ids + 1] > graph.indptr[ids]]])
+    return found[:size]
+
+
+def _uniform_sampler(graph: CSRGraph, rng: np.random.Generator, batch_size: int) -> Generator[Sample, None, None]:
+    while True:
+        ids = rng.integers(graph.n_nodes, size=batch_size)
+        yield ids, _node_degrees(graph, ids), np.ones(batch_size), np.zeros(batch_size, dtype=np.int64)
+
+
+def _random_walk_sampler(graph: CSRGraph, rng: np.random.Generator, batch_size: int) -> Generator[Sample, None, None]:
+    """
+    N_WALKERS independent walks moving together. A walk visits nodes in proportion to their number
+    of CSR entries, so visits are weighted by its inverse; every walker is a batch.
+    """
+    indptr, indices = graph.indptr, graph.indices
+    current = _random_non_isolated(graph, rng, N_WALKERS)
+    walkers = np.arange(N_WALKERS)
+
+    def step(current: np.ndarray) -> np.ndarray:
+        lengths = indptr[current + 1] - indptr[current]
+        return indices[indptr[current] + (rng.random(N_WALKERS) * lengths).astype(np.int64)].astype(np.int64)
+
+    for _ in range(WALK_BURN_IN):
+        current = step(current)
+    n_steps = -(-batch_size // N_WALKERS)
+    while True:
+        visits = np.empty((n_steps, N_WALKERS), dtype=np.int64)
+        for k in range(n_steps):
+            current = step(current)
+            visits[k] = current
+        visits = visits.ravel()
+        yield (visits, _node_degrees(graph, visits), 1.0 / (indptr[visits + 1] - indptr[visits]),
+               np.tile(walkers, n_steps))
+
+
+def _bfs_sampler(graph: CSRGraph, rng: np.random.Generator, batch_size: int) -> Generator[Sample, None, None]:
+    """
+    One truncated BFS per batch from the end of a random edge, sampling every edge end it scans
+    until batch_size samples. On a locally tree-like graph, a node is scanned once per edge to the
+    frontier, about in proportion to its degree, so samples are weighted like those of a random
+    walk. The correction is only approximate on graphs with degree correlations, especially for
+    small batches that stay close to the hubs.
+    """
+    visited = np.zeros(graph.n_nodes, dtype=np.bool_)
+    run = 0
+    while True:
+        seed = graph.indices[rng.integers(len(graph.indices), size=1)].astype(np.int64)
+        visited[seed] = True
+        scanned, touched, n_scanned = [seed], [seed], 1
+        frontier = seed.astype(np.int32)
+        while len(frontier) and n_scanned < batch_size:
+            _, neighbors = _expand(graph.indptr, graph.indices, frontier)
+            neighbors = neighbors[:batch_size - n_scanned].astype(np.int64)
+            scanned.append(neighbors)
+            n_scanned += len(neighbors)
+            frontier = np.unique(neighbors[~visited[neighbors]]).astype(np.int32)
+            visited[frontier] = True
+            touched.append(frontier)
+        visited[np.concatenate(touched)] = False
+        ids = np.concatenate(scanned)
+        yield (ids, _node_degrees(graph, ids), 1.0 / (graph.indptr[ids + 1] - graph.indptr[ids]),
+               np.full(len(ids), run, dtype=np.int64))
+        run += 1
+
+
+def _bin_estimates(
+    degrees: np.ndarray, weights: np.ndarray, batches: np.ndarray, z: float, independent: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Ratio estimate of the fraction of nodes of every degree, with a confidence interval: the
+    Wilson interval for independent samples, otherwise batch means, the spread of the estimates
+    of the batches, which accounts for the correlation of the samples within a batch.
+
+    Returns:
+        (fractions, lower, upper): arrays indexed by degree.
+    """
+    totals = np.bincount(degrees, weights=weights)
+    fractions = totals / weights.sum()
+    if independent:
+        n = len(degrees)
+        center = (fractions + z * z / (2 * n)) / (1 + z * z / n)
+        half = z * np.sqrt(fractions * (1 - fractions) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return fractions, np.maximum(center - half, 0.0), np.minimum(center + half, 1.0)
+
+    n_batches = int(batches.max()) + 1
+    n_bins = len(totals)
+    per_batch = np.bincount(batches * n_bins + degrees, weights=weights,
+                            minlength=n_batches * n_bins).reshape(n_batches, n_bins)
+    batch_weights = per_batch.sum(axis=1)
+    present = batch_weights > 0
+    if np.count_nonzero(present) < 2:
+        return fractions, np.zeros(n_bins), np.ones(n_bins)
+    batch_fractions = per_batch[present] / batch_weights[present, None]
+    half = z * batch_fractions.std(axis=0, ddof=1) / np.sqrt(np.count_nonzero(present))
+    return fractions, np.maximum(fractions - half, 0.0), np.minimum(fractions + half, 1.0)
 
 
 class DegreeDistribution:
-    def distribution(graph: nx.Graph, num_destinations: int) -> Dict[int, int]:
+    def distribution(graph: GraphLike, num_destinations: int) -> Dict[int, int]:
         """
         Compute the degree distribution from a restricted BFS on a given graph.
 
         Args:
-            graph: The NetworkX graph object.
+            graph: A NetworkX graph or a CSRGraph.
             num_destinations: The number of destination nodes to consider.
 
         Returns:
             A dictionary where the keys are degrees, and the values are the number of nodes with that degree.
         """
+        graph = as_csr(graph)
+
         # Select random start node and destinations
-        nodes = list(graph.nodes)
-        start_node = random.choice(nodes)
-        destinations = set(random.sample(
-            nodes, min(num_destinations, len(nodes))))
+        start_node = random.randrange(graph.n_nodes)
+        destinations = np.array(random.sample(
+            range(graph.n_nodes), min(num_destinations, graph.n_nodes)), dtype=np.int64)
 
         # Perform restricted BFS
-        restricted_result = bfs_restricted(graph, start_node, destinations)
+        distances = _level_bfs(graph, start_node, destinations)
 
         # Calculate degree distribution
-        degree_count = defaultdict(int)
-        for node in restricted_result:
-            degree = graph.degree[node]
-            degree_count[degree] += 1
+        return _histogram_dict(np.bincount(graph.degrees()[distances >= 0]))
+
+    def exact(graph: GraphLike) -> Dict[int, int]:
+        """
+        Degree distribution of the whole graph, one np.bincount over the CSR degrees.
+
+        Time Complexity: O(n + m) for a NetworkX graph, O(n) for a CSRGraph
+
+        Returns:
+            A dictionary where the keys are degrees, and the values are the number of nodes with that degree.
+        """
+        return _histogram_dict(np.bincount(as_csr(graph).degrees()))
+
+    def streaming(path: str, n_nodes: Optional[int] = None, chunk_size: int = 1 << 20) -> Dict[int, int]:
+        """
+        Degree distribution of a binary edge file (see `GraphIO.write_edge_chunks`), read chunk by
+        chunk without building the graph: only the degree of every node is kept in memory.
+        Every line of the file counts as one edge, a self-loop adds 2 to the degree of its node.
+
+        Args:
+            path: The binary edge file.
+            n_nodes: Optional number of nodes, to count the isolated nodes that no edge mentions.
+            chunk_size: Number of edges read at a time.
+
+        Returns:
+            A dictionary where the keys are degrees, and the values are the number of nodes with that degree.
+        """
+        degrees = np.zeros(n_nodes or 0, dtype=np.int64)
+        for chunk in GraphIO.read_edge_chunks(path, chunk_size):
+            chunk_degrees = np.bincount(chunk.ravel())
+            if len(chunk_degrees) > len(degrees):
+                degrees = np.concatenate(
+                    [degrees, np.zeros(len(chunk_degrees) - len(degrees), dtype=np.int64)])
+            degrees[:len(chunk_degrees)] += chunk_degrees
+
+        degree_count = np.bincount(degrees)
+        if n_nodes is None and len(degree_count):
+            # without n_nodes, the ids that appear in no edge are not known to be nodes
+            degree_count[0] = 0
+        return _histogram_dict(degree_count)
+
+    def estimate(
+        graph: GraphLike,
+        method: str = "uniform",
+        budget: int = 10_000,
+        tolerance: Optional[float] = None,
+        confidence: float = 0.95,
+        batch_size: int = 1000,
+        rng: Optional[np.random.Generator] = None,
+        n_nodes: Optional[int] = None
+    ) -> Tuple[Dict[int, float], Dict[int, Tuple[float, float]], int]:
+        """
+        Estimate the degree distribution from a sample of nodes, touching only the sampled nodes.
+
+        Methods:
+            - "uniform": nodes drawn uniformly, unbiased, independent samples (Wilson intervals).
+            - "random_walk": parallel random walks, which only need the neighbors of the current
+              nodes; visits are biased towards high degrees and reweighted by 1 / degree
+              (Hansen-Hurwitz).
+            - "bfs": truncated BFS from random seeds, sampling the edge ends they scan,
+              reweighted like a random walk (approximate, see `_bfs_sampler`).
+            Intervals of the last two use batch means over the walkers or the BFS runs.
+
+        Only "uniform" is unbiased over the whole graph. A walk or a BFS never leaves the connected
+        component it starts in, so the last two estimate the degree fractions of the components
+        they reached: isolated nodes and unreached components are missing. The fractions are
+        scaled by `n_nodes`, all the nodes by default, which is exact for a connected graph; pass
+        the size of the sampled population (e.g. the giant component) when it is known. On a
+        graph without edges, they return the exact distribution, every node of degree 0, without
+        sampling.
+
+        Sampling stops after `budget` samples, or as soon as the confidence interval of every bin
+        has a half-width below `tolerance` (as a fraction of the nodes).
 
-        return dict(degree_count)
+        Args:
+            graph: A NetworkX graph, a CSRGraph or the path of a binary CSR file.
+            method: "uniform", "random_walk" or "bfs".
+            budget: Maximum number of sampled nodes.
+            tolerance: Optional target half-width of the intervals, checked after every batch.
+            confidence: Confidence level of the intervals.
+            batch_size: Number of samples drawn between two checks.
+            rng: Random generator.
+            n_nodes: Optional number of nodes the fractions are scaled to, the whole graph by
+                default.
+
+        Returns:
+            (distribution, intervals, n_samples): the estimated number of nodes of every sampled
+            degree, the confidence interval of every count, and the number of samples used.
+        """
+        samplers = {"uniform": _uniform_sampler, "random_walk": _random_walk_sampler, "bfs": _bfs_sampler}
+        if method not in samplers:
+            raise ValueError(f"Unknown sampling method: {method}")
+        graph = as_csr(graph)
+        n = graph.n_nodes if n_nodes is None else n_nodes
+        if method != "uniform" and len(graph.indices) == 0:
+            return ({0: float(n)}, {0: (float(n), float(n))}, 0) if n else ({}, {}, 0)
+        rng = np.random.default_rng() if rng is None else rng
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+        degrees, weights, batches = [], [], []
+        n_samples = 0
+        for batch in samplers[method](graph, rng, min(batch_size, budget)):
+            batch = [array[:budget - n_samples] for array in batch[1:]]
+            for arrays, array in zip((degrees, weights, batches), batch):
+                arrays.append(array)
+            n_samples += len(batch[0])
+            fractions, lower, upper = _bin_estimates(
+                *(np.concatenate(arrays) for arrays in (degrees, weights, batches)),
+                z, method == "uniform")
+            if n_samples >= budget or \
+                    (tolerance is not None and np.max(upper - lower) / 2 <= tolerance):
+                break
+
+        sampled = np.flatnonzero(fractions > 0).tolist()
+        distribution = {k: float(n * fractions[k]) for k in sampled}
+        intervals = {k: (float(n * lower[k]), float(n * upper[k])) for k in sampled}
+        return distribution, intervals, n_samples
+
+    def tail_exponent(distribution: Dict[int, float], min_degree: int = 1) -> float:
+        """
+        Maximum likelihood exponent alpha of a power-law tail p(k) ~ k^-alpha over the degrees
+        k >= min_degree, with the discrete approximation of Clauset, Shalizi and Newman:
+            alpha = 1 + N / sum_k N_k ln(k / (min_degree - 1/2))
+        Counts can be estimates (see `estimate`).
+        """
+        tail = [(degree, count) for degree, count in distribution.items() if degree >= min_degree]
+        total = sum(count for _, count in tail)
+        log_sum = sum(count * np.log(degree / (min_degree - 0.5)) for degree, count in tail)
+        return 1 + total / log_sum if log_sum > 0 else float("nan")
 
     def plot(distribution: Dict[int, int]) -> None:
         degrees = list(distribution.keys())
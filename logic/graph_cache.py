@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import weakref
+
+import numpy as np
+
+CACHE_MAX_BYTES = 1 << 28
+
+
+def _nbytes(value: Any) -> int:
+    """
+    Memory held by a cached value: arrays and objects with an `nbytes` attribute (CSRGraph),
+    recursively through tuples and lists, about 100 bytes per item of a dict, anything else is
+    considered small.
+    """
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return 100 * len(value)
+    return int(getattr(value, "nbytes", 0))
+
+
+def _freeze(value: Any) -> None:
+    """
+    Make the cached arrays read-only, they are shared by every caller.
+    """
+    if isinstance(value, (tuple, list)):
+        for item in value:
+            _freeze(item)
+    elif isinstance(value, np.ndarray):
+        value.setflags(write=False)
+
+
+class GraphCache:
+    """
+    Values derived from a graph (degrees, components, BFS results, ...), keyed on the graph object
+    and a name. Only CSRGraph objects, which are never modified in place, are cached: a NetworkX
+    graph offers no cheap way to tell that it changed, so its values are always recomputed.
+    Graphs are held through weak references, their entries disappear with them, and the least
+    recently used entries are evicted once the cached arrays exceed `max_bytes`.
+
+    Example:
+        >>> graph_cache.get(graph, "degrees", lambda: compute_degrees(graph))
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        # (id(graph), key) -> (value, nbytes), least recently used first
+        self._entries: "OrderedDict[Tuple[int, Hashable], Tuple[Any, int]]" = OrderedDict()
+        self._keys: Dict[int, set] = {}
+        self._n_bytes = 0
+
+    def get(self, graph: Any, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Cached value of `key` for `graph`, computed by `compute()` on a miss. Anything but a
+        CSRGraph (NetworkX graphs, paths) is not cached.
+        """
+        # duck-typed, csr_graph imports this module
+        if not hasattr(graph, "indptr"):
+            return compute()
+
+        entry_key = (id(graph), key)
+        entry = self._entries.get(entry_key)
+        if entry is not None:
+            self._entries.move_to_end(entry_key)
+            return entry[0]
+
+        value = compute()
+        _freeze(value)
+        self._store(graph, entry_key, (value, _nbytes(value)))
+        return value
+
+    def invalidate(self, graph: Optional[Any] = None) -> None:
+        """
+        Drop the entries of a graph, or of every graph.
+        """
+        if graph is None:
+            self._entries.clear()
+            self._keys.clear()
+            self._n_bytes = 0
+        else:
+            self._forget(id(graph))
+
+    @property
+    def n_bytes(self) -> int:
+        return self._n_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    ###################################################################################
+
+    def _store(self, graph: Any, entry_key: Tuple[int, Hashable], entry: Tuple[Any, int]) -> None:
+        self._remove(entry_key)
+        graph_id = entry_key[0]
+        if graph_id not in self._keys:
+            self._keys[graph_id] = set()
+            weakref.finalize(graph, self._forget, graph_id, True)
+        self._keys[graph_id].add(entry_key)
+        self._entries[entry_key] = entry
+        self._n_bytes += entry[1]
+        while self._n_bytes > self.max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_key: Tuple[int, Hashable]) -> None:
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self._n_bytes -= entry[1]
+            self._keys[entry_key[0]].discard(entry_key)
+
+    def _forget(self, graph_id: int, collected: bool = False) -> None:
+        for entry_key in list(self._keys.get(graph_id, ())):
+            self._remove(entry_key)
+        if collected:
+            # the id can now be reused by another graph
+            self._keys.pop(graph_id, None)
+
+
+graph_cache = GraphCache()
+
+
+def invalidate(graph: Optional[Any] = None) -> None:
+    """
+    Drop the cached values of a graph, or of every graph (e.g. to release their memory).
+    """
+    graph_cache.invalidate(graph)
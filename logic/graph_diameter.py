@@ -1,40 +1,523 @@
 from collections import deque
 import random
-from typing import Dict, List, Tuple
-import networkx as nx
+import time
+from typing import Dict, List, Optional, Tuple
 
-from .bfs import bfs
+import numpy as np
+
+from .bfs import _direction_optimizing_bfs, multi_source_bfs
+from .components import component_members, connected_components
+from .csr_graph import CSRGraph, GraphLike, as_csr
+from .graph_cache import graph_cache
 
 ###################################################################################
 
 
-def graph_diameter(graph: nx.Graph) -> int:
-    diameter = 0
-    for node in graph:
-        distances = bfs(graph, node)
-        farthest_distance = max(distances.values())
-        diameter = max(diameter, farthest_distance)
-    
-    return diameter
+def _all_sources_bfs(graph: GraphLike) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    `multi_source_bfs` from every node, cached per graph.
+    """
+    graph = as_csr(graph)
+    return graph_cache.get(graph, "all_sources_bfs", lambda: multi_source_bfs(graph))
+
+
+def _bfs(graph: CSRGraph, source: int, cache: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distances and parents of a full direction-optimizing BFS. With `cache`, the tree is cached per
+    graph and source: only for roots that are reused, such as the node of largest degree that
+    starts both the sweeps and the bounding algorithms. The one-off BFS runs of the bounding loops
+    would otherwise evict the CSR, degree and component entries.
+    """
+    if not cache:
+        return _direction_optimizing_bfs(graph, source, None, True)
+    return graph_cache.get(
+        graph, ("bfs", source), lambda: _direction_optimizing_bfs(graph, source, None, True))
+
 
-def double_bfs(graph: nx.Graph) -> int:
+def graph_diameter(graph: GraphLike) -> int:
+    """
+    Exact diameter (largest eccentricity within the connected components) from the
+    eccentricities of every node, computed by a bit-parallel multi-source BFS.
+    """
+    eccentricities, _, _, _ = _all_sources_bfs(graph)
+    return int(eccentricities.max()) if len(eccentricities) else 0
+
+
+def distance_distribution(graph: GraphLike) -> np.ndarray:
+    """
+    Exact distance distribution: result[d] is the number of ordered pairs of nodes at distance d.
+    """
+    _, _, _, histogram = _all_sources_bfs(graph)
+    return histogram
+
+
+def closeness_centrality(graph: GraphLike) -> np.ndarray:
+    """
+    Closeness of every node, (r - 1) / sum of the distances scaled by (r - 1) / (n - 1) for the
+    r nodes reached, as `nx.closeness_centrality` does on disconnected graphs.
+    """
+    graph = as_csr(graph)
+    _, distance_sums, reached, _ = _all_sources_bfs(graph)
+    closeness = np.zeros(graph.n_nodes, dtype=np.float64)
+    connected = distance_sums > 0
+    closeness[connected] = (reached[connected] - 1) ** 2 / \
+        (distance_sums[connected] * (graph.n_nodes - 1))
+    return closeness
+
+
+def double_bfs(graph: GraphLike) -> int:
     """
     Perform a double BFS: start from a random node, find the farthest node, and perform BFS again from there.
 
     Args:
-        graph: A NetworkX graph object.
+        graph: A NetworkX graph or a CSRGraph.
 
     Returns:
-        A dictionary with the start node, farthest node, and the diameter of the graph.
+        The diameter estimate of the graph.
     """
-    start_node = random.choice(list(graph.nodes))
+    graph = as_csr(graph)
+    # start in the largest connected component
+    _, components = _components(graph)
+    start_node = int(random.choice(components[0]))
 
     # First BFS to find the farthest node
-    distances = bfs(graph, start_node)
-    farthest_node = max(distances, key=distances.get)
+    distances, _ = _bfs(graph, start_node)
+    farthest_node = int(distances.argmax())
 
     # Second BFS from the farthest node
-    second_distances = bfs(graph, farthest_node)
-    diameter = max(second_distances.values())
+    second_distances, _ = _bfs(graph, farthest_node)
+    diameter = int(second_distances.max())
 
     return diameter
+
+###################################################################################
+# BOUNDING ECCENTRICITIES
+
+
+def _components(graph: CSRGraph) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """
+    Returns:
+        The component label of every node, and the sorted ids of every component, largest first.
+    """
+    def compute() -> Tuple[np.ndarray, List[np.ndarray]]:
+        labels, sizes = connected_components(graph)
+        components = component_members(labels, sizes)
+        components.sort(key=len, reverse=True)
+        return labels, components
+    return graph_cache.get(graph, "sorted_components", compute)
+
+
+def _component_graph(graph: CSRGraph, component: np.ndarray) -> CSRGraph:
+    if len(component) == graph.n_nodes:
+        return graph
+    return graph_cache.get(graph, ("component", int(component[0]), len(component)),
+                           lambda: graph.subgraph(component))
+
+
+def _bounding_step(
+    graph: CSRGraph, candidates: np.ndarray, lower: np.ndarray, upper: np.ndarray, step: int
+) -> int:
+    """
+    One BFS of the bounding algorithms on a connected graph: the source alternates between the
+    candidate of largest upper bound and the one of smallest lower bound (ties broken by the largest
+    degree), then every candidate w gets max(e(v) - d, d) <= e(w) <= e(v) + d, in place.
+
+    Returns:
+        The eccentricity of the source.
+    """
+    degrees = graph.degrees()[candidates]
+    if step % 2 == 0:
+        best = np.lexsort((-degrees, -upper))[0]
+    else:
+        best = np.lexsort((-degrees, lower))[0]
+
+    # the first source is the node of largest degree, as for `diameter_bounds`
+    distances, _ = _bfs(graph, int(candidates[best]), cache=step == 0)
+    eccentricity = int(distances.max())
+    d = distances[candidates].astype(np.int64)
+    np.maximum(lower, np.maximum(eccentricity - d, d), out=lower)
+    np.minimum(upper, eccentricity + d, out=upper)
+    return eccentricity
+
+
+def exact_diameter(graph: GraphLike) -> Tuple[int, int]:
+    """
+    Exact diameter by the bounding-diameters algorithm (Takes & Kosters), run on each connected
+    component. Every BFS from a node v with eccentricity e(v) bounds the eccentricity of every
+    other node w: max(e(v) - d(v, w), d(v, w)) <= e(w) <= e(v) + d(v, w). The nodes whose bounds
+    can no longer change the diameter bounds are pruned.
+    On real-world graphs a handful of BFS runs is usually enough.
+
+    Args:
+        graph: A NetworkX graph, a CSRGraph or the path of a binary CSR file.
+
+    Returns:
+        (diameter, n_bfs): the diameter (largest eccentricity within the connected components),
+        and the number of BFS runs used.
+    """
+    graph = as_csr(graph)
+    _, components = _components(graph)
+
+    diameter, n_bfs = 0, 0
+    for component in components:
+        # a component of s nodes has a diameter below s
+        if len(component) - 1 <= diameter:
+            break
+        component_diameter, component_bfs = _bounding_diameter(
+            _component_graph(graph, component))
+        diameter = max(diameter, component_diameter)
+        n_bfs += component_bfs
+    return diameter, n_bfs
+
+
+def _bounding_diameter(graph: CSRGraph) -> Tuple[int, int]:
+    """
+    Bounding-diameters loop of `exact_diameter` on a connected graph.
+    """
+    candidates = np.arange(graph.n_nodes)
+    lower = np.zeros(graph.n_nodes, dtype=np.int64)
+    upper = np.full(graph.n_nodes, np.iinfo(np.int64).max, dtype=np.int64)
+    diameter_lower, diameter_upper = 0, np.iinfo(np.int64).max
+    n_bfs = 0
+
+    while diameter_lower < diameter_upper and len(candidates):
+        eccentricity = _bounding_step(graph, candidates, lower, upper, n_bfs)
+        n_bfs += 1
+        diameter_lower = max(diameter_lower, eccentricity)
+        diameter_upper = min(diameter_upper, 2 * eccentricity, int(upper.max()))
+
+        # a node is useless once it can neither raise the lower bound nor lower the upper bound
+        keep = (upper > diameter_lower) | (2 * lower < diameter_upper)
+        keep &= lower < upper
+        candidates, lower, upper = candidates[keep], lower[keep], upper[keep]
+
+    return diameter_lower, n_bfs
+
+
+def eccentricities(graph: GraphLike) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Eccentricity of every node within its connected component, by the bounding-eccentricities
+    algorithm (Takes & Kosters): BFS runs tighten lower and upper bounds on the eccentricity of
+    every node (see `exact_diameter`) until they meet, which usually takes far fewer than n runs.
+
+    Args:
+        graph: A NetworkX graph, a CSRGraph or the path of a binary CSR file.
+
+    Returns:
+        (eccentricities, components, n_bfs): int32 arrays indexed by node id of the eccentricities
+        and of the connected component labels, and the number of BFS runs used.
+    """
+    graph = as_csr(graph)
+    return graph_cache.get(graph, "eccentricities", lambda: _eccentricities(graph))
+
+
+def _eccentricities(graph: CSRGraph) -> Tuple[np.ndarray, np.ndarray, int]:
+    labels, components = _components(graph)
+    result = np.zeros(graph.n_nodes, dtype=np.int32)
+
+    n_bfs = 0
+    for component in components:
+        if len(component) <= 2:
+            result[component] = len(component) - 1
+            continue
+        component_eccentricities, component_bfs = _bounding_eccentricities(
+            _component_graph(graph, component))
+        result[component] = component_eccentricities
+        n_bfs += component_bfs
+    return result, labels.astype(np.int32), n_bfs
+
+
+def _bounding_eccentricities(graph: CSRGraph) -> Tuple[np.ndarray, int]:
+    """
+    Bounding-eccentricities loop of `eccentricities` on a connected graph.
+    """
+    result = np.zeros(graph.n_nodes, dtype=np.int32)
+    candidates = np.arange(graph.n_nodes)
+    lower = np.zeros(graph.n_nodes, dtype=np.int64)
+    upper = np.full(graph.n_nodes, np.iinfo(np.int64).max, dtype=np.int64)
+    n_bfs = 0
+
+    while len(candidates):
+        _bounding_step(graph, candidates, lower, upper, n_bfs)
+        n_bfs += 1
+
+        known = lower == upper
+        result[candidates[known]] = lower[known]
+        candidates, lower, upper = candidates[~known], lower[~known], upper[~known]
+
+    return result, n_bfs
+
+
+def radius(graph: GraphLike) -> np.ndarray:
+    """
+    Radius (smallest eccentricity) of every connected component, indexed by the component labels
+    of `eccentricities`.
+    """
+    ecc, components, _ = eccentricities(graph)
+    result = np.full(components.max() + 1 if len(components) else 0,
+                     np.iinfo(np.int32).max, dtype=np.int32)
+    np.minimum.at(result, components, ecc)
+    return result
+
+
+def center(graph: GraphLike) -> np.ndarray:
+    """
+    Ids of the nodes whose eccentricity is the radius of their connected component.
+    """
+    ecc, components, _ = eccentricities(graph)
+    smallest = np.full(components.max() + 1 if len(components) else 0,
+                       np.iinfo(np.int32).max, dtype=np.int32)
+    np.minimum.at(smallest, components, ecc)
+    return np.flatnonzero(ecc == smallest[components])
+
+
+def periphery(graph: GraphLike) -> np.ndarray:
+    """
+    Ids of the nodes whose eccentricity is the diameter of their connected component.
+    """
+    ecc, components, _ = eccentricities(graph)
+    largest = np.zeros(components.max() + 1 if len(components) else 0, dtype=np.int32)
+    np.maximum.at(largest, components, ecc)
+    return np.flatnonzero(ecc == largest[components])
+
+###################################################################################
+# MULTI-SWEEP
+
+
+def _path_middle(parents: np.ndarray, end: int, length: int) -> int:
+    """
+    Node halfway between the root of a BFS tree and `end`, at distance `length` from the root.
+    """
+    node = end
+    for _ in range(length // 2):
+        node = parents[node]
+    return int(node)
+
+
+def diameter_bounds(
+    graph: GraphLike,
+    budget_seconds: Optional[float] = None,
+    max_bfs: Optional[int] = None,
+    sweep: int = 4
+) -> Tuple[int, int, int]:
+    """
+    Anytime diameter estimate: repeated 2-sweeps or 4-sweeps on the largest connected component
+    until the time or BFS budget is spent or the bounds meet.
+
+    - 2-sweep: BFS from r, then from the farthest node a, whose eccentricity is a lower bound,
+      then from the middle u of the a-b path, a central node giving the upper bound 2 * e(u):
+      3 BFS runs.
+    - 4-sweep: the same from r, then a BFS from the farthest node from u, and from the middle of
+      that second path: 5 BFS runs.
+
+    Every BFS from v gives e(v) <= D <= 2 * e(v). The first sweep starts from the node of largest
+    degree, the next ones from random nodes. Every BFS has a distinct source: a sweep goes to the
+    farthest node not yet used, and skips a middle node already used.
+    The BFS runs on the whole graph, which is cheaper than extracting the component; the other
+    components only bound the diameter by their size - 1.
+
+    Args:
+        graph: A NetworkX graph, a CSRGraph or the path of a binary CSR file.
+        budget_seconds: Optional time budget, including the component search, checked between
+            BFS runs.
+        max_bfs: Optional maximum number of BFS runs.
+        sweep: 2 or 4.
+
+    Returns:
+        (lower, upper, n_bfs): bounds on the diameter and the number of BFS runs used.
+        Without any budget a single sweep is run, sweep + 1 BFS runs, and at least one 2-sweep
+        (2 BFS runs) is always run.
+    """
+    if sweep not in (2, 4):
+        raise ValueError("sweep must be 2 or 4")
+    deadline = None if budget_seconds is None else time.time() + budget_seconds
+    graph = as_csr(graph)
+    if graph.n_nodes == 0:
+        return 0, 0, 0
+    _, components = _components(graph)
+    giant = components[0]
+    others = len(components[1]) - 1 if len(components) > 1 else 0
+
+    lower, upper, n_bfs = 0, np.iinfo(np.int64).max, 0
+    tried = set()
+    start = int(giant[np.argmax(graph.degrees()[giant])])
+
+    def exhausted() -> bool:
+        if n_bfs < 2:
+            return False
+        if deadline is None and max_bfs is None:
+            return n_bfs >= sweep + 1
+        return (deadline is not None and time.time() >= deadline) or \
+            (max_bfs is not None and n_bfs >= max_bfs)
+
+    def run(source: int) -> Tuple[np.ndarray, np.ndarray, int]:
+        nonlocal lower, upper, n_bfs
+        tried.add(source)
+        distances, parents = _bfs(graph, source, cache=n_bfs == 0)
+        eccentricity = int(distances.max())
+        lower, upper = max(lower, eccentricity), min(upper, 2 * eccentricity)
+        n_bfs += 1
+        return distances, parents, eccentricity
+
+    def farthest_untried(distances: np.ndarray) -> Optional[int]:
+        distances = distances.astype(np.int64)
+        distances[list(tried)] = -1
+        node = int(distances.argmax())
+        return node if distances[node] >= 0 else None
+
+    while lower < upper and not exhausted() and start is not None:
+        distances, _, _ = run(start)
+        middle = start
+        for _ in range(sweep // 2):
+            if lower >= upper or exhausted():
+                break
+            a = farthest_untried(distances)
+            if a is None:
+                break
+            distances, parents, eccentricity = run(a)
+            middle = _path_middle(parents, int(distances.argmax()), eccentricity)
+            # a BFS from a tried node would not tighten the bounds
+            if middle in tried or lower >= upper or exhausted():
+                break
+            distances, _, _ = run(middle)
+        untried = np.setdiff1d(giant, np.fromiter(tried, dtype=np.int64))
+        start = int(random.choice(untried)) if len(untried) else None
+
+    return lower, max(int(upper), others), n_bfs
+
+###################################################################################
+# HYPERANF
+
+HYPERANF_CHUNK_BYTES = 1 << 26
+
+
+def _hyperloglog_registers(n_nodes: int, precision: int, seed: int) -> np.ndarray:
+    """
+    One HyperLogLog counter of 2 ** precision uint8 registers per node, holding the node itself.
+    Nodes are hashed with splitmix64: the low `precision` bits pick the register, the rank of the
+    lowest set bit of the rest is its value.
+    """
+    with np.errstate(over="ignore"):
+        h = np.arange(n_nodes, dtype=np.uint64) + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        h ^= h >> np.uint64(31)
+    rest = h >> np.uint64(precision)
+    lowest_bit = rest & (~rest + np.uint64(1))
+    rank = np.full(n_nodes, 64 - precision + 1, dtype=np.uint8)
+    nonzero = rest != 0
+    rank[nonzero] = np.log2(lowest_bit[nonzero].astype(np.float64)).astype(np.uint8) + 1
+
+    registers = np.zeros((n_nodes, 1 << precision), dtype=np.uint8)
+    registers[np.arange(n_nodes), (h & np.uint64((1 << precision) - 1)).astype(np.intp)] = rank
+    return registers
+
+
+def _hyperloglog_sizes(registers: np.ndarray) -> np.ndarray:
+    """
+    Cardinality estimate of every counter, with the linear counting correction for small sets.
+    """
+    m = registers.shape[1]
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    powers = np.ldexp(1.0, -np.arange(256)).astype(np.float64)
+    sizes = np.empty(len(registers), dtype=np.float64)
+    step = max(1, HYPERANF_CHUNK_BYTES // (8 * m))
+    for begin in range(0, len(registers), step):
+        block = registers[begin:begin + step]
+        estimate = alpha * m * m / powers[block].sum(axis=1)
+        zeros = (block == 0).sum(axis=1)
+        small = (estimate <= 2.5 * m) & (zeros > 0)
+        estimate[small] = m * np.log(m / zeros[small])
+        sizes[begin:begin + step] = estimate
+    return sizes
+
+
+def neighbourhood_function(
+    graph: GraphLike,
+    precision: int = 6,
+    max_distance: Optional[int] = None,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Approximate neighbourhood function by HyperANF: every node keeps a HyperLogLog counter of the
+    nodes within distance t, and step t + 1 takes the register-wise max over its neighbours.
+
+    The per-edge max is vectorized by rank: rows are sorted by decreasing degree, so that the
+    rows owning a k-th edge form a prefix, and pass k merges the counters at the other end of
+    these edges with one np.maximum over whole register rows.
+
+    Args:
+        graph: A NetworkX graph, a CSRGraph or the path of a binary CSR file.
+        precision: log2 of the number of registers per node, between 4 and 16. The relative
+            standard error of each counter is about 1.04 / sqrt(2 ** precision).
+        max_distance: Optional number of steps; by default, iterate until no counter changes.
+        seed: Seed of the node hash.
+
+    Returns:
+        result[t]: estimated number of ordered pairs of nodes at distance at most t.
+    """
+    if not 4 <= precision <= 16:
+        raise ValueError("precision must be between 4 and 16")
+    graph = as_csr(graph)
+    if graph.n_nodes == 0:
+        return np.zeros(1, dtype=np.float64)
+    indptr, indices = graph.indptr, graph.indices
+    row_degrees = np.diff(indptr)
+    order = np.argsort(-row_degrees, kind="stable")
+    starts = indptr[order]
+    # rows_with_edge[k]: number of rows having a k-th edge
+    rows_with_edge = np.searchsorted(
+        -row_degrees[order], -np.arange(row_degrees.max(initial=0)), side="left")
+
+    registers = _hyperloglog_registers(graph.n_nodes, precision, seed)
+    sizes = _hyperloglog_sizes(registers)
+    result = [sizes.sum()]
+
+    while max_distance is None or len(result) <= max_distance:
+        merged = registers.take(order, axis=0)
+        for k, count in enumerate(rows_with_edge):
+            neighbours = registers.take(indices[starts[:count] + k], axis=0)
+            np.maximum(merged[:count], neighbours, out=merged[:count])
+        changed = np.flatnonzero((merged != registers.take(order, axis=0)).any(axis=1))
+        if len(changed) == 0:
+            break
+        registers[order[changed]] = merged[changed]
+        sizes[order[changed]] = _hyperloglog_sizes(merged[changed])
+        result.append(max(result[-1], sizes.sum()))
+    return np.array(result, dtype=np.float64)
+
+
+def approximate_distance_distribution(
+    graph: GraphLike,
+    precision: int = 6,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    HyperANF estimate of `distance_distribution`: result[d] is the estimated number of ordered
+    pairs of nodes at distance d.
+    """
+    return np.diff(neighbourhood_function(graph, precision, seed=seed), prepend=0.0)
+
+
+def effective_diameter(distribution: np.ndarray, alpha: float = 0.9) -> float:
+    """
+    Smallest distance, linearly interpolated, within which a fraction `alpha` of the connected
+    pairs lie, from an exact or approximate distance distribution (distance 0 included).
+    """
+    cumulative = np.cumsum(distribution[1:], dtype=np.float64)
+    if len(cumulative) == 0 or cumulative[-1] <= 0:
+        return 0.0
+    target = alpha * cumulative[-1]
+    d = int(np.searchsorted(cumulative, target))
+    below = cumulative[d - 1] if d > 0 else 0.0
+    return d + (target - below) / (cumulative[d] - below)
+
+
+def average_distance(distribution: np.ndarray) -> float:
+    """
+    Average distance between connected pairs of distinct nodes, from an exact or approximate
+    distance distribution (distance 0 included).
+    """
+    counts = np.asarray(distribution[1:], dtype=np.float64)
+    total = counts.sum()
+    return float(np.dot(np.arange(1, len(counts) + 1), counts) / total) if total > 0 else 0.0
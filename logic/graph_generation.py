@@ -1,12 +1,31 @@
-from typing import Generator, List, Tuple
+from typing import Generator, Iterator, List, Optional, Tuple
 import networkx as nx
+import numpy as np
 import random
 import matplotlib.pyplot as plt
+from logic.csr_graph import CSRGraph
 from logic.node_partition import NodePartition
-from logic.utils import _cartesian_product, _external_pair
+from logic.utils import _cartesian_product, _external_pair, _fixed_size_chunks, \
+    _geometric_rank_batches, _geometric_ranks, _sample_distinct, _unrank_pairs
+
+DEFAULT_CHUNK_SIZE = 1 << 20
 
 
 class GraphGeneration:
+    @staticmethod
+    def _build_graph(n_vertices: int, edges: np.ndarray, csr: bool = False) -> nx.Graph | CSRGraph:
+        """
+        Build a NetworkX graph (or a CSRGraph if `csr`) on the nodes 0..n_vertices-1 from an edge array.
+        """
+        if csr:
+            return CSRGraph.from_edges(n_vertices, edges)
+        g = nx.Graph()
+        g.add_nodes_from(range(n_vertices))
+        g.add_edges_from(edges.tolist())
+        return g
+
+    ###################################################################################
+
     @staticmethod
     def erdos_graph_m(n_vertices: int, m_edges: int) -> nx.Graph:
         if m_edges is None:
@@ -39,6 +58,55 @@ class GraphGeneration:
 
         return g
 
+    #########################################
+
+    @staticmethod
+    def erdos_graph_m_fast(
+        n_vertices: int, m_edges: int = None,
+        csr: bool = False,
+        rng: Optional[np.random.Generator] = None
+    ) -> nx.Graph | CSRGraph:
+        """
+        Exact G(n, m): m distinct pair ranks are sampled from the C(n, 2) pairs of the upper triangle
+        (in batches, duplicates removed and redrawn), then unranked into node pairs.
+
+        Time Complexity: O(n + m log m)
+
+        Raises:
+            ValueError: If m_edges is larger than the number of pairs.
+        """
+        if m_edges is None:
+            m_edges = n_vertices // 2
+        if rng is None:
+            rng = np.random.default_rng()
+
+        n_pairs = n_vertices * (n_vertices - 1) // 2
+        if m_edges > n_pairs:
+            raise ValueError(
+                f"Cannot place {m_edges} edges on {n_vertices} vertices")
+
+        x, y = _unrank_pairs(_sample_distinct(rng, n_pairs, m_edges))
+        return GraphGeneration._build_graph(n_vertices, np.stack([x, y], axis=1), csr)
+
+    @staticmethod
+    def erdos_graph_p_fast(
+        n_vertices: int, probability: float = 0.5,
+        csr: bool = False,
+        rng: Optional[np.random.Generator] = None
+    ) -> nx.Graph | CSRGraph:
+        """
+        G(n, p) by Batagelj-Brandes geometric skipping over the ranks of the C(n, 2) pairs.
+
+        Time Complexity: O(n + m)
+        - m: number of edges produced, about p * n^2 / 2.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+
+        n_pairs = n_vertices * (n_vertices - 1) // 2
+        x, y = _unrank_pairs(_geometric_ranks(rng, n_pairs, probability))
+        return GraphGeneration._build_graph(n_vertices, np.stack([x, y], axis=1), csr)
+
     ###################################################################################
 
     @staticmethod
@@ -82,24 +150,195 @@ class GraphGeneration:
     @staticmethod
     def generate_erdos_m_partition_model(
         partition: List[List[int]],
-        m_edges: float, q: float
-    ) -> nx.Graph:
-        n_nodes = sum([len(group) for group in partition])
+        m_edges: float, q: float,
+        csr: bool = False,
+        rng: Optional[np.random.Generator] = None
+    ) -> nx.Graph | CSRGraph:
+        """
+        Each group receives m_edges distinct internal edges (all its pairs if it has fewer),
+        each pair across two groups is linked with probability q.
+        Internal edges are sampled as distinct pair ranks in [0, C(s, 2)) mapped to node pairs
+        arithmetically, so the memory is proportional to the number of edges produced.
 
-        g = nx.Graph()
-        g.add_nodes_from(range(n_nodes))
+        Time Complexity: O(k^2 + n + m log m)
+        - k: number of groups, m: number of edges produced.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        n_nodes = sum([len(group) for group in partition])
+        groups = [np.asarray(group, dtype=np.int64) for group in partition]
 
         # m edges per group
-        for group in partition:
-            possible_edges = [(u, v) for u in group for v in group if u < v]
-            selected_edges = random.sample(
-                possible_edges, min(m_edges, len(possible_edges)))
-            g.add_edges_from(selected_edges)
+        blocks = []
+        for group in groups:
+            n_pairs = len(group) * (len(group) - 1) // 2
+            blocks.append(GraphGeneration._intra_group_edges(
+                group, min(int(m_edges), n_pairs), rng))
 
         # edges with a probability of q
-        for group1, group2 in _external_pair(len(partition)):
-            for e1, e2 in _cartesian_product(partition[group1], partition[group2]):
-                if random.random() < q:
-                    g.add_edge(e1, e2)
+        blocks.append(GraphGeneration._inter_group_edges(groups, q, rng))
 
-        return g
+        return GraphGeneration._build_graph(n_nodes, np.concatenate(blocks), csr)
+
+    #########################################
+
+    @staticmethod
+    def _intra_group_edges(group: np.ndarray, n_edges: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        n_edges distinct edges inside a group, drawn as pair ranks in [0, C(s, 2)) and unranked.
+
+        Time Complexity: O(n_edges log n_edges)
+        """
+        x, y = _unrank_pairs(_sample_distinct(
+            rng, len(group) * (len(group) - 1) // 2, n_edges))
+        return np.stack([group[x], group[y]], axis=1)
+
+    @staticmethod
+    def _inter_group_edges(groups: List[np.ndarray], q: float, rng: np.random.Generator) -> np.ndarray:
+        """
+        Edges across groups, each pair being linked with probability q.
+        For each pair of groups, the number of edges is drawn from a binomial, then that many
+        distinct ranks of the cartesian product are sampled and mapped back to node pairs.
+
+        Time Complexity: O(k^2 + m log m)
+        """
+        blocks = [np.empty((0, 2), dtype=np.int64)]
+        for group1, group2 in _external_pair(len(groups)):
+            size1, size2 = len(groups[group1]), len(groups[group2])
+            n_pairs = size1 * size2
+            ranks = _sample_distinct(rng, n_pairs, rng.binomial(n_pairs, q))
+            x, y = np.divmod(ranks, size2)
+            blocks.append(
+                np.stack([groups[group1][x], groups[group2][y]], axis=1))
+        return np.concatenate(blocks)
+
+    @staticmethod
+    def _partition_p_edges(
+        partition: List[List[int]],
+        p: float, q: float,
+        rng: np.random.Generator
+    ) -> np.ndarray:
+        """
+        Edges of the stochastic block model: each pair inside a group is linked with probability p,
+        each pair across two groups with probability q.
+        For each block, the number of edges is drawn from a binomial, then that many distinct pair
+        ranks are sampled and mapped back to node pairs.
+
+        Time Complexity: O(k^2 + n + m log m)
+        - k: number of groups, m: number of edges produced.
+
+        Returns:
+            An int64 array of shape (m, 2).
+        """
+        groups = [np.asarray(group, dtype=np.int64) for group in partition]
+        blocks = []
+
+        # edges with a probability of p
+        for group in groups:
+            n_pairs = len(group) * (len(group) - 1) // 2
+            blocks.append(GraphGeneration._intra_group_edges(
+                group, rng.binomial(n_pairs, p), rng))
+
+        # edges with a probability of q
+        blocks.append(GraphGeneration._inter_group_edges(groups, q, rng))
+
+        return np.concatenate(blocks)
+
+    @staticmethod
+    def generate_erdos_p_partition_model_fast(
+        partition: List[List[int]],
+        p: float, q: float,
+        csr: bool = False,
+        rng: Optional[np.random.Generator] = None
+    ) -> nx.Graph | CSRGraph:
+        """
+        Same model as `generate_erdos_p_partition_model`, with a cost proportional to the number of
+        edges produced instead of the number of node pairs.
+
+        Args:
+            partition: List of groups of nodes, the nodes being 0..n-1.
+            p: Probability of an edge inside a group.
+            q: Probability of an edge between two groups.
+            csr: Whether to return a CSRGraph instead of a NetworkX graph.
+            rng: Optional numpy random generator.
+
+        Example:
+            >>> partition = NodePartition.partition_list(int(1e5), 4, as_set=False)
+            >>> GraphGeneration.generate_erdos_p_partition_model_fast(partition, 1e-3, 1e-5, csr=True)
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        n_nodes = sum([len(group) for group in partition])
+        edges = GraphGeneration._partition_p_edges(partition, p, q, rng)
+        return GraphGeneration._build_graph(n_nodes, edges, csr)
+
+    ###################################################################################
+    # STREAMING
+
+    @staticmethod
+    def stream_erdos_graph_p(
+        n_vertices: int, probability: float = 0.5,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        rng: Optional[np.random.Generator] = None
+    ) -> Generator[np.ndarray, None, None]:
+        """
+        Stream the edges of G(n, p) without materializing the graph.
+        Same sampling as `erdos_graph_p_fast`, the memory is O(chunk_size).
+
+        Yields:
+            int64 arrays of shape (chunk_size, 2), the last one may be shorter.
+
+        Example:
+            >>> chunks = GraphGeneration.stream_erdos_graph_p(int(1e7), 2e-6)
+            >>> GraphIO.write_edge_chunks("gnp.edges", chunks)
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+
+        n_pairs = n_vertices * (n_vertices - 1) // 2
+        blocks = (np.stack(_unrank_pairs(ranks), axis=1)
+                  for ranks in _geometric_rank_batches(rng, n_pairs, probability, chunk_size))
+        yield from _fixed_size_chunks(blocks, chunk_size)
+
+    @staticmethod
+    def stream_erdos_p_partition_model(
+        partition: List[List[int]],
+        p: float, q: float,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        rng: Optional[np.random.Generator] = None
+    ) -> Generator[np.ndarray, None, None]:
+        """
+        Stream the edges of the stochastic block model of `generate_erdos_p_partition_model`
+        without materializing the graph. Every block is drawn by geometric skipping over its pair
+        ranks, the memory is O(n + chunk_size).
+
+        Yields:
+            int64 arrays of shape (chunk_size, 2), the last one may be shorter.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        groups = [np.asarray(group, dtype=np.int64) for group in partition]
+        yield from _fixed_size_chunks(
+            GraphGeneration._stream_partition_blocks(groups, p, q, chunk_size, rng), chunk_size)
+
+    @staticmethod
+    def _stream_partition_blocks(
+        groups: List[np.ndarray],
+        p: float, q: float,
+        batch_size: int,
+        rng: np.random.Generator
+    ) -> Iterator[np.ndarray]:
+        # edges with a probability of p
+        for group in groups:
+            n_pairs = len(group) * (len(group) - 1) // 2
+            for ranks in _geometric_rank_batches(rng, n_pairs, p, batch_size):
+                x, y = _unrank_pairs(ranks)
+                yield np.stack([group[x], group[y]], axis=1)
+
+        # edges with a probability of q
+        for group1, group2 in _external_pair(len(groups)):
+            size2 = len(groups[group2])
+            n_pairs = len(groups[group1]) * size2
+            for ranks in _geometric_rank_batches(rng, n_pairs, q, batch_size):
+                x, y = np.divmod(ranks, size2)
+                yield np.stack([groups[group1][x], groups[group2][y]], axis=1)
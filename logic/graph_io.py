@@ -0,0 +1,210 @@
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Generator, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .csr_graph import CSRGraph
+from .utils import _sorted_unique
+
+EDGE_DTYPE = np.dtype('<i4')
+# text files smaller than this per worker are parsed in fewer processes
+PARALLEL_MIN_BYTES = 1 << 24
+
+
+def _parse_byte_range(
+    path: str, start: int, end: int, comments: str, n_columns: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parse the lines of a text edge list between two byte offsets (worker of `GraphIO.read_edgelist`).
+    It is run in spawned processes, so it must stay a module-level function of a module without
+    side effects at import.
+
+    Returns:
+        The int64 (k, 2) array of original ids, and the float64 weights (empty if n_columns == 2).
+    """
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    dtype = [('u', '<i8'), ('v', '<i8')]
+    if n_columns > 2:
+        dtype.append(('w', '<f8'))
+    table = np.loadtxt(io.BytesIO(data), dtype=dtype, comments=comments,
+                       usecols=range(len(dtype)), ndmin=1)
+    edges = np.stack([table['u'], table['v']], axis=1)
+    weights = table['w'] if n_columns > 2 else np.empty(0)
+    return edges, weights
+
+
+class GraphIO:
+    """
+    Binary edge file: a headerless sequence of (u, v) pairs of little-endian int32 node ids,
+    so that chunks can be appended and the number of edges is the file size / 8.
+    """
+
+    @staticmethod
+    def write_edge_chunks(path: str, chunks: Iterable[np.ndarray], append: bool = False) -> int:
+        """
+        Write a stream of edge chunks to a binary edge file, holding one chunk in memory at a time.
+
+        Args:
+            path: Destination file.
+            chunks: Arrays of shape (k, 2), e.g. from `GraphGeneration.stream_erdos_graph_p`.
+            append: Whether to append to an existing file instead of overwriting it.
+
+        Returns:
+            The number of edges written.
+
+        Raises:
+            ValueError: If a node id does not fit in an int32.
+        """
+        n_edges = 0
+        with open(path, 'ab' if append else 'wb') as file:
+            for chunk in chunks:
+                chunk = np.asarray(chunk)
+                if len(chunk) and (chunk.min() < 0 or chunk.max() > np.iinfo(EDGE_DTYPE).max):
+                    raise ValueError("Node ids must fit in an int32")
+                file.write(chunk.astype(EDGE_DTYPE, copy=False).tobytes())
+                n_edges += len(chunk)
+        return n_edges
+
+    @staticmethod
+    def count_edges(path: str) -> int:
+        return os.path.getsize(path) // (2 * EDGE_DTYPE.itemsize)
+
+    @staticmethod
+    def read_edge_chunks(path: str, chunk_size: int = 1 << 20) -> Generator[np.ndarray, None, None]:
+        """
+        Stream a binary edge file through a memory map, chunk_size edges at a time.
+
+        Yields:
+            int32 arrays of shape (chunk_size, 2), the last one may be shorter.
+        """
+        if GraphIO.count_edges(path) == 0:
+            return
+        edges = np.memmap(path, dtype=EDGE_DTYPE, mode='r').reshape(-1, 2)
+        for start in range(0, len(edges), chunk_size):
+            yield np.array(edges[start:start + chunk_size])
+
+    ###################################################################################
+    # TEXT EDGE LISTS
+
+    @staticmethod
+    def read_edgelist(
+        path: str,
+        comments: str = '#',
+        n_workers: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """
+        Parse a whitespace separated text edge list "u v [weight]" with integer node ids and
+        remap the ids to the contiguous range [0, n).
+        The file is split into byte ranges aligned on line ends, parsed in bulk by numpy in a
+        pool of spawned processes (in-process for small files).
+
+        Time Complexity: O(m log m)
+
+        Args:
+            path: Text edge list.
+            comments: Prefix of the comment lines.
+            n_workers: Number of processes, defaults to the number of cores.
+
+        Returns:
+            (node_ids, edges, weights): node_ids[i] is the original id of node i, edges an int32
+            array of shape (m, 2) of contiguous ids, weights None when the file has two columns.
+
+        Example:
+            >>> node_ids, edges, _ = GraphIO.read_edgelist("graph.txt")
+            >>> labels = Louvain.identification(CSRGraph.from_edges(len(node_ids), edges))
+            >>> GraphIO.translate_labels(node_ids, labels)
+            {original id: community label, ...}
+        """
+        n_columns = GraphIO._count_columns(path, comments)
+        if n_columns == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, 2), dtype=np.int32), None
+
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        size = os.path.getsize(path)
+        n_workers = max(1, min(n_workers, size // PARALLEL_MIN_BYTES))
+        ranges = GraphIO._byte_ranges(path, n_workers)
+        jobs = [(path, start, end, comments, n_columns) for start, end in ranges]
+
+        if n_workers == 1:
+            parts = [_parse_byte_range(*job) for job in jobs]
+        else:
+            # spawn rather than fork: a fork after numba's thread pool started (e.g. a parallel
+            # FastLouvain) leaves the interpreter unable to exit
+            with ProcessPoolExecutor(n_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                parts = list(executor.map(_parse_byte_range, *zip(*jobs)))
+
+        raw = np.concatenate([part[0] for part in parts])
+        weights = np.concatenate([part[1] for part in parts]) if n_columns > 2 else None
+
+        # remap the original ids to contiguous int32 ids
+        node_ids = _sorted_unique(raw.ravel())
+        edges = np.searchsorted(node_ids, raw).astype(np.int32)
+        return node_ids, edges, weights
+
+    @staticmethod
+    def translate_labels(node_ids: np.ndarray, labels: Sequence[int]) -> Dict[int, int]:
+        """
+        Translate a result indexed by contiguous ids (e.g. `Louvain.identification`) back to the
+        original node ids returned by `read_edgelist`.
+        """
+        return dict(zip(np.asarray(node_ids).tolist(), labels))
+
+    @staticmethod
+    def _count_columns(path: str, comments: str) -> int:
+        with open(path, 'rb') as file:
+            for line in file:
+                line = line.split(comments.encode(), 1)[0].split()
+                if line:
+                    return len(line)
+        return 0
+
+    @staticmethod
+    def _byte_ranges(path: str, n_ranges: int) -> List[Tuple[int, int]]:
+        """
+        Split a file into n_ranges byte ranges of similar size, each boundary being a line start.
+        """
+        size = os.path.getsize(path)
+        boundaries = [0]
+        with open(path, 'rb') as file:
+            for i in range(1, n_ranges):
+                # the boundary is the first line start at or after the split point
+                file.seek(max(i * size // n_ranges - 1, boundaries[-1]))
+                file.readline()
+                boundaries.append(max(file.tell(), boundaries[-1]))
+        boundaries.append(size)
+        return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+    @staticmethod
+    def load_edgelist(path: str, comments: str = '#', n_workers: Optional[int] = None) -> CSRGraph:
+        """
+        Parse a text edge list with `read_edgelist` into a CSRGraph whose `nodes` are the original
+        ids (a range when they are already 0..n-1).
+        """
+        node_ids, edges, weights = GraphIO.read_edgelist(path, comments, n_workers)
+        n_nodes = len(node_ids)
+        identity = n_nodes == 0 or (node_ids[0] == 0 and node_ids[-1] == n_nodes - 1)
+        return CSRGraph.from_edges(n_nodes, edges, weights, None if identity else node_ids)
+
+    @staticmethod
+    def convert_edgelist(
+        text_path: str, csr_path: str,
+        comments: str = '#', n_workers: Optional[int] = None
+    ) -> CSRGraph:
+        """
+        One-shot conversion of a text edge list to the binary CSR format of `CSRGraph.save`.
+        The original node ids are stored in the file when they are not already 0..n-1.
+
+        Returns:
+            The converted graph, memory-mapped from csr_path.
+
+        Example:
+            >>> GraphIO.convert_edgelist("graph.txt", "graph.csr")
+            >>> Louvain.identification("graph.csr")
+        """
+        GraphIO.load_edgelist(text_path, comments, n_workers).save(csr_path)
+        return CSRGraph.load(csr_path)
@@ -0,0 +1,169 @@
+import os
+import struct
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from .bfs import _bidirectional_search, _bidirectional_workspace, _direction_optimizing_bfs
+from .csr_graph import CSRGraph, GraphLike, as_csr
+
+# binary landmark file: header, then the int64 landmark ids and the (n_nodes, k) distance matrix
+LANDMARK_MAGIC = b'LANDMARK'
+LANDMARK_VERSION = 1
+LANDMARK_HEADER = struct.Struct('<8sIIQQ')  # magic, version, itemsize, n_nodes, n_landmarks
+
+
+class LandmarkIndex:
+    """
+    BFS distances from k landmarks to every node, as a (n_nodes, k) uint8 matrix, or uint16 when
+    the graph is too deep, where the largest value marks unreachable nodes.
+
+    By the triangle inequality, for every landmark l:
+        |d(l, u) - d(l, v)| <= d(u, v) <= d(l, u) + d(l, v)
+    which gives distance bounds in O(k), and prunes the bidirectional BFS of exact queries: a node
+    whose distance from one end plus its lower bound to the other end exceeds the upper bound
+    cannot lie on a shortest path.
+
+    Queries take and return original nodes (see `CSRGraph.nodes`).
+    """
+
+    def __init__(self, graph: CSRGraph, landmarks: np.ndarray, distances: np.ndarray):
+        self.graph = graph
+        self.landmarks = np.asarray(landmarks)
+        self.distances = np.asarray(distances)
+        self.sentinel = int(np.iinfo(self.distances.dtype).max)
+        self._workspace = None
+
+    @staticmethod
+    def build(
+        graph: GraphLike,
+        n_landmarks: int = 16,
+        strategy: str = "degree",
+        rng: Optional[np.random.Generator] = None
+    ) -> "LandmarkIndex":
+        """
+        One BFS per landmark.
+
+        Time Complexity: O(k (n + m))
+
+        Args:
+            graph: A NetworkX graph, a CSRGraph or the path of a binary CSR file.
+            n_landmarks: Number of landmarks k, at most the number of nodes.
+            strategy: "degree" picks the nodes of largest degree, central in most real graphs,
+                "random" picks uniformly.
+            rng: Random generator of the "random" strategy.
+
+        Raises:
+            ValueError: On an unknown strategy, or a distance that does not fit in uint16.
+        """
+        graph = as_csr(graph)
+        n_landmarks = min(n_landmarks, graph.n_nodes)
+        if strategy == "degree":
+            landmarks = np.argsort(-graph.degrees(), kind="stable")[:n_landmarks]
+        elif strategy == "random":
+            rng = np.random.default_rng() if rng is None else rng
+            landmarks = rng.choice(graph.n_nodes, n_landmarks, replace=False)
+        else:
+            raise ValueError(f"Unknown landmark strategy: {strategy}")
+
+        rows = [_direction_optimizing_bfs(graph, int(landmark)) for landmark in landmarks]
+        deepest = max((int(row.max()) for row in rows), default=0)
+        if deepest < np.iinfo(np.uint8).max:
+            dtype = np.uint8
+        elif deepest < np.iinfo(np.uint16).max:
+            dtype = np.uint16
+        else:
+            raise ValueError("Distances do not fit in uint16")
+
+        distances = np.empty((graph.n_nodes, n_landmarks), dtype=dtype)
+        for column, row in enumerate(rows):
+            distances[:, column] = np.where(row >= 0, row, np.iinfo(dtype).max)
+        return LandmarkIndex(graph, landmarks.astype(np.int64), distances)
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """
+        Write the index in the binary format read by `load`; the graph itself is not saved.
+        """
+        with open(path, 'wb') as file:
+            file.write(LANDMARK_HEADER.pack(
+                LANDMARK_MAGIC, LANDMARK_VERSION, self.distances.dtype.itemsize,
+                self.graph.n_nodes, len(self.landmarks)))
+            self.landmarks.astype('<i8', copy=False).tofile(file)
+            np.ascontiguousarray(self.distances).tofile(file)
+
+    @staticmethod
+    def load(path: Union[str, os.PathLike], graph: GraphLike) -> "LandmarkIndex":
+        """
+        Map a file written by `save` into memory, for the graph it was built on.
+
+        Raises:
+            ValueError: If the file is not a landmark index of a graph of this size.
+        """
+        with open(path, 'rb') as file:
+            magic, version, itemsize, n_nodes, n_landmarks = LANDMARK_HEADER.unpack(
+                file.read(LANDMARK_HEADER.size))
+        if magic != LANDMARK_MAGIC or version != LANDMARK_VERSION:
+            raise ValueError(f"{path} is not a landmark index")
+        graph = as_csr(graph)
+        if n_nodes != graph.n_nodes:
+            raise ValueError(f"{path} indexes a graph of {n_nodes} nodes, not {graph.n_nodes}")
+
+        offset = LANDMARK_HEADER.size
+        landmarks = np.fromfile(path, dtype='<i8', count=n_landmarks, offset=offset)
+        dtype = np.uint8 if itemsize == 1 else np.dtype('<u2')
+        if n_nodes * n_landmarks == 0:
+            distances = np.empty((n_nodes, n_landmarks), dtype=dtype)
+        else:
+            distances = np.memmap(path, dtype=dtype, mode='r', offset=offset + 8 * n_landmarks,
+                                  shape=(n_nodes, n_landmarks))
+        return LandmarkIndex(graph, landmarks, distances)
+
+    ###################################################################################
+
+    def _bounds(self, u: int, v: int) -> Tuple[int, Optional[int]]:
+        a = self.distances[u].astype(np.int64)
+        b = self.distances[v].astype(np.int64)
+        a_reached, b_reached = a != self.sentinel, b != self.sentinel
+        if np.any(a_reached != b_reached):
+            return -1, -1
+        both = a_reached & b_reached
+        if not np.any(both):
+            return int(u != v), None
+        return max(int(np.abs(a[both] - b[both]).max()), int(u != v)), int((a[both] + b[both]).min())
+
+    def bounds(self, u, v) -> Tuple[int, Optional[int]]:
+        """
+        Lower and upper bounds on d(u, v) from the landmarks in O(k).
+
+        Returns:
+            (lower, upper): upper is None when no landmark reaches u and v,
+            (-1, -1) when a landmark reaches only one of them, i.e. they are not connected.
+        """
+        return self._bounds(self.graph.index_of(u), self.graph.index_of(v))
+
+    def query(self, u, v) -> Tuple[int, List]:
+        """
+        Exact distance and shortest path, by a bidirectional BFS pruned with the landmark bounds.
+
+        Returns:
+            (distance, path): -1 and an empty list if u and v are not connected.
+        """
+        source, target = self.graph.index_of(u), self.graph.index_of(v)
+        lower, upper = self._bounds(source, target)
+        if lower < 0:
+            return -1, []
+        if self._workspace is None:
+            self._workspace = _bidirectional_workspace(self.graph.n_nodes)
+        length, path = _bidirectional_search(
+            self.graph, source, target, self._workspace, np.asarray(self.distances),
+            np.iinfo(np.int32).max if upper is None else upper)
+        return length, [self.graph.nodes[i] for i in path.tolist()]
+
+    def distance(self, u, v) -> int:
+        """
+        Exact distance, without any search when the landmark bounds meet.
+        """
+        lower, upper = self.bounds(u, v)
+        if lower == upper:
+            return lower
+        return self.query(u, v)[0]
@@ -1,4 +1,5 @@
-from typing import Generator, Tuple
+from typing import Generator, Iterable, Tuple
+import numpy as np
 
 
 def _external_pair(set_size: int) -> Generator[Tuple[int, int], None, None]:
@@ -17,3 +18,108 @@ def _cartesian_product(X, Y) -> Generator[Tuple[int, int], None, None]:
     for x in X:
         for y in Y:
             yield x, y
+
+
+def _unrank_pairs(ranks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Map ranks in [0, C(s, 2)) to the pairs (x, y), x < y, in the order
+    (0, 1), (0, 2), (1, 2), (0, 3), (1, 3), (2, 3), ...
+    i.e. rank = y * (y - 1) / 2 + x. The result does not depend on s.
+
+    Example:
+        >>> _unrank_pairs(np.array([0, 1, 2, 3]))
+        (array([0, 0, 1, 0]), array([1, 2, 2, 3]))
+    """
+    ranks = np.asarray(ranks, dtype=np.int64)
+    y = ((1 + np.sqrt(1 + 8 * ranks.astype(np.float64))) / 2).astype(np.int64)
+    # fix the rounding errors of the square root on large ranks
+    y -= y * (y - 1) // 2 > ranks
+    y += (y + 1) * y // 2 <= ranks
+    return ranks - y * (y - 1) // 2, y
+
+
+def _sample_distinct(rng: np.random.Generator, population: int, k: int) -> np.ndarray:
+    """
+    Sorted sample of k distinct integers in [0, population).
+
+    Time Complexity: O(k log k) when k <= population / 2, O(population) otherwise
+    """
+    if 2 * k > population:
+        # draw the complement instead
+        mask = np.ones(population, dtype=bool)
+        mask[_sample_distinct(rng, population, population - k)] = False
+        return np.flatnonzero(mask)
+
+    sample = _sorted_unique(rng.integers(0, population, size=k))
+    while len(sample) < k:
+        extra = rng.integers(0, population, size=k - len(sample))
+        sample = _sorted_unique(np.concatenate([sample, extra]))
+    return sample
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    """
+    Sorted distinct values, cheaper than np.unique on large integer arrays.
+    """
+    values = np.sort(values)
+    keep = np.ones(len(values), dtype=bool)
+    keep[1:] = values[1:] != values[:-1]
+    return values[keep]
+
+
+def _geometric_ranks(rng: np.random.Generator, population: int, p: float) -> np.ndarray:
+    """
+    Sorted ranks in [0, population) where each rank is kept independently with probability p,
+    drawn by Batagelj-Brandes geometric skipping: the gaps between two kept ranks are geometric,
+    so only the kept ranks are ever generated. The gaps are drawn in batches.
+
+    Time Complexity: O(population * p)
+    """
+    expected = population * max(min(p, 1.0), 0.0)
+    batch_size = int(expected + 3 * np.sqrt(expected) + 16)
+    batches = list(_geometric_rank_batches(rng, population, p, batch_size))
+    return np.concatenate(batches) if batches else np.empty(0, dtype=np.int64)
+
+
+def _geometric_rank_batches(
+    rng: np.random.Generator, population: int, p: float, batch_size: int
+) -> Generator[np.ndarray, None, None]:
+    """
+    Same ranks as `_geometric_ranks`, yielded in increasing batches of at most batch_size ranks
+    so that the memory stays bounded.
+    """
+    if p <= 0 or population == 0:
+        return
+    if p >= 1:
+        for start in range(0, population, batch_size):
+            yield np.arange(start, min(start + batch_size, population), dtype=np.int64)
+        return
+
+    last = -1
+    while True:
+        ranks = last + np.cumsum(rng.geometric(p, size=batch_size))
+        if ranks[-1] >= population:
+            yield ranks[:np.searchsorted(ranks, population)]
+            return
+        yield ranks
+        last = ranks[-1]
+
+
+def _fixed_size_chunks(
+    blocks: Iterable[np.ndarray], chunk_size: int
+) -> Generator[np.ndarray, None, None]:
+    """
+    Regroup a stream of arrays into arrays of exactly chunk_size rows (the last one may be shorter).
+    """
+    buffer, size = [], 0
+    for block in blocks:
+        while len(block):
+            take = min(chunk_size - size, len(block))
+            buffer.append(block[:take])
+            size += take
+            block = block[take:]
+            if size == chunk_size:
+                yield np.concatenate(buffer)
+                buffer, size = [], 0
+    if size:
+        yield np.concatenate(buffer)
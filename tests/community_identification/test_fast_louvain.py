@@ -0,0 +1,153 @@
+import unittest
+import networkx as nx
+import numpy as np
+from logic.community_identification.fast_louvain import FastLouvain, _coloring_kernel
+from logic.csr_graph import CSRGraph, as_csr
+from logic.graph_generation import GraphGeneration
+
+
+class TestFastLouvain(unittest.TestCase):
+    def test_local_moving(self):
+        graph = as_csr(nx.Graph([(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3), (2, 3)]))
+        membership = np.arange(6, dtype=np.int32)
+        n_moves = FastLouvain._local_moving(graph, membership, 1.0, np.random.default_rng(0))
+        self.assertGreater(n_moves, 0)
+        self.assertEqual(membership[0], membership[1])
+        self.assertEqual(membership[4], membership[5])
+        self.assertNotEqual(membership[0], membership[5])
+
+    def test_aggregate(self):
+        graph = nx.Graph()
+        graph.add_edge(0, 1, weight=2.0)
+        graph.add_edge(1, 2, weight=3.0)
+        graph.add_edge(2, 2, weight=1.5)
+        csr = as_csr(graph)
+        aggregated = FastLouvain._aggregate(csr, np.array([0, 0, 1], dtype=np.int32), 2)
+        self.assertEqual(aggregated.indptr.tolist(), [0, 2, 4])
+        self.assertEqual(aggregated.indices.tolist(), [0, 1, 0, 1])
+        self.assertEqual(aggregated.weights.tolist(), [2.0, 3.0, 3.0, 1.5])
+        np.testing.assert_allclose(aggregated.weighted_degrees(),
+                                   [csr.weighted_degrees()[:2].sum(), csr.weighted_degrees()[2]])
+
+    def test_identification(self):
+        partition = [list(range(i, 600, 4)) for i in range(4)]
+        graph = GraphGeneration.generate_erdos_p_partition_model_fast(
+            partition, 0.1, 0.002, csr=True, rng=np.random.default_rng(0))
+        result = FastLouvain.identification(graph, seed=0)
+        self.assertEqual(len(result), 600)
+        self.assertEqual(sorted(set(result)), list(range(4)))
+        for group in partition:
+            self.assertEqual(len({result[node] for node in group}), 1)
+
+    def test_matches_networkx_modularity(self):
+        graph = nx.karate_club_graph()
+        result = FastLouvain.identification(graph, seed=1)
+        communities = [{node for node, label in enumerate(result) if label == community}
+                       for community in set(result)]
+        best = nx.community.modularity(graph, nx.community.louvain_communities(graph, seed=1))
+        self.assertGreater(nx.community.modularity(graph, communities), best - 0.02)
+
+    def test_coloring(self):
+        graph = as_csr(nx.gnm_random_graph(200, 800, seed=0))
+        colors = _coloring_kernel(graph.indptr, graph.indices, np.arange(200, dtype=np.int32))
+        self.assertTrue(np.all(colors >= 0))
+        self.assertFalse(np.any(colors[graph.sources()] == colors[graph.indices]))
+
+    def test_parallel_identification(self):
+        partition = [list(range(i, 600, 4)) for i in range(4)]
+        graph = GraphGeneration.generate_erdos_p_partition_model_fast(
+            partition, 0.1, 0.002, csr=True, rng=np.random.default_rng(0))
+        result = FastLouvain.identification(graph, seed=0, n_workers=2)
+        self.assertEqual(sorted(set(result)), list(range(4)))
+        for group in partition:
+            self.assertEqual(len({result[node] for node in group}), 1)
+        # the moves of a batch do not depend on how it is split between the workers
+        self.assertEqual(FastLouvain.identification(graph, seed=3, n_workers=4),
+                         FastLouvain.identification(graph, seed=3, n_workers=2))
+
+    def test_parallel_batches(self):
+        # min_batch=1 runs every colour class in parallel, 10**9 moves them all serially
+        graph = as_csr(nx.barabasi_albert_graph(2000, 3, seed=0))
+        results = {}
+        for n_workers, min_batch in ((2, 1), (4, 1), (2, 10 ** 9)):
+            membership = np.arange(graph.n_nodes, dtype=np.int32)
+            n_moves = FastLouvain._parallel_local_moving(
+                graph, membership, 1.0, np.random.default_rng(0), n_workers, min_batch=min_batch)
+            # moves are only applied while they raise the modularity, so the level converges
+            self.assertLess(n_moves, 20 * graph.n_nodes)
+            results[n_workers, min_batch] = membership
+        np.testing.assert_array_equal(results[2, 1], results[4, 1])
+
+        serial = np.arange(graph.n_nodes, dtype=np.int32)
+        FastLouvain._local_moving(graph, serial, 1.0, np.random.default_rng(0))
+        networkx_graph = graph.to_networkx()
+        scores = [nx.community.modularity(networkx_graph, [np.flatnonzero(labels == label).tolist()
+                                                           for label in np.unique(labels)])
+                  for labels in (results[2, 1], serial)]
+        self.assertGreater(scores[0], scores[1] - 0.02)
+
+    def test_parallel_modularity(self):
+        graph = nx.karate_club_graph()
+        scores = []
+        for n_workers in (1, 4):
+            result = FastLouvain.identification(graph, seed=1, n_workers=n_workers)
+            communities = [{node for node, label in enumerate(result) if label == community}
+                           for community in set(result)]
+            scores.append(nx.community.modularity(graph, communities))
+        self.assertGreater(scores[1], scores[0] - 0.02)
+
+    def test_warm_start(self):
+        # two triangles joined by (2, 3), found as two communities
+        graph = as_csr(nx.Graph([(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3), (2, 3), (6, 7)]))
+        previous = [0, 0, 0, 1, 1, 1, 2, 2]
+        membership, reset = FastLouvain._warm_start(
+            graph, previous, np.array([[3, 6]]), np.array([[0, 1], [2, 3]]))
+        self.assertEqual(reset.tolist(), [0, 1, 2, 3, 6])
+        self.assertEqual(len(set(membership[reset].tolist())), 5)
+        self.assertEqual(membership[4], membership[5])
+        self.assertNotIn(membership[4], membership[reset])
+        self.assertNotEqual(membership[6], membership[7])
+
+    def test_incremental(self):
+        partition = [list(range(i, 600, 4)) for i in range(4)]
+        graph = GraphGeneration.generate_erdos_p_partition_model_fast(
+            partition, 0.1, 0.002, csr=True, rng=np.random.default_rng(0))
+        previous = FastLouvain.identification(graph, seed=0)
+        self.assertEqual(FastLouvain.incremental(graph, previous, seed=0), previous)
+
+        # delete the edges of node 0, then link it and a new node 600 to the group of node 1
+        rng = np.random.default_rng(1)
+        deleted = np.column_stack([np.zeros(graph.degrees()[0], dtype=np.int64), graph.neighbors(0)])
+        group = np.array(partition[1])
+        inserted = np.concatenate([np.column_stack([np.zeros(30, dtype=np.int64), rng.choice(group, 30, replace=False)]),
+                                   np.column_stack([np.full(30, 600), rng.choice(group, 30, replace=False)])])
+        edges = np.column_stack([graph.sources(), graph.indices])
+        edges = edges[(edges[:, 0] < edges[:, 1]) & (edges[:, 0] != 0)]
+        updated = CSRGraph.from_edges(601, np.concatenate([edges, inserted]))
+        result = FastLouvain.incremental(updated, previous, inserted, deleted, seed=0)
+        self.assertEqual(len(result), 601)
+        self.assertEqual(result[0], result[1])
+        self.assertEqual(result[600], result[1])
+        for group in partition:
+            self.assertEqual(len({result[node] for node in group if node != 0}), 1)
+
+        full = FastLouvain.identification(updated, seed=0)
+        scores = []
+        for labels in (result, full):
+            communities = [{node for node, label in enumerate(labels) if label == community}
+                           for community in set(labels)]
+            scores.append(nx.community.modularity(updated.to_networkx(), communities))
+        self.assertGreater(scores[0], scores[1] - 0.01)
+        parallel = FastLouvain.incremental(updated, previous, inserted, deleted, seed=0, n_workers=2)
+        self.assertEqual(parallel[0], parallel[1])
+        self.assertEqual(len(set(parallel)), 4)
+
+    def test_edgeless(self):
+        self.assertEqual(FastLouvain.identification(CSRGraph.from_edges(3, np.empty((0, 2)))),
+                         [0, 1, 2])
+        self.assertEqual(FastLouvain.identification(CSRGraph.from_edges(3, np.empty((0, 2))), n_workers=2),
+                         [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 import networkx as nx
 from typing import Set, List
 from logic.community_identification.girvan_newman import GirvanNewman
+from logic.csr_graph import as_csr
 
 
 class TestGirvanNewman(unittest.TestCase):
@@ -28,6 +29,20 @@ class TestGirvanNewman(unittest.TestCase):
         self.assertTrue({0, 1} in components)
         self.assertTrue({2, 3} in components)
 
+    def test_get_components_of_edge_array(self) -> None:
+        graph = as_csr(nx.path_graph(4))
+        edges, keys = GirvanNewman._edge_array(graph)
+        self.assertEqual(edges.tolist(), [[0, 1], [1, 2], [2, 3]])
+        self.assertEqual(keys.tolist(), [1, 6, 11])
+        components = GirvanNewman._get_components(graph, edges[[0, 2]])
+        self.assertEqual(sorted(map(sorted, components)), [[0, 1], [2, 3]])
+
+    def test_identification_labelled_nodes(self) -> None:
+        graph = nx.relabel_nodes(nx.barbell_graph(4, 0), lambda node: f"n{node}")
+        partition = GirvanNewman.identification(graph, max_iter=10)
+        self.assertEqual(sorted(map(sorted, partition)),
+                         [["n0", "n1", "n2", "n3"], ["n4", "n5", "n6", "n7"]])
+
     def test_calculate_modularity(self) -> None:
         graph = nx.Graph()
         graph.add_edges_from([(0, 1), (1, 2), (2, 0)])
@@ -0,0 +1,71 @@
+import unittest
+import networkx as nx
+import numpy as np
+from logic.community_identification.fast_louvain import FastLouvain
+from logic.community_identification.leiden import Leiden
+from logic.csr_graph import CSRGraph, as_csr
+from logic.graph_generation import GraphGeneration
+
+
+class TestLeiden(unittest.TestCase):
+    def test_fast_local_moving(self):
+        graph = as_csr(nx.Graph([(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3), (2, 3)]))
+        membership = np.arange(6, dtype=np.int32)
+        n_moves = Leiden._fast_local_moving(graph, membership, 1.0, np.random.default_rng(0))
+        self.assertGreater(n_moves, 0)
+        self.assertEqual(membership[0], membership[1])
+        self.assertEqual(membership[4], membership[5])
+        self.assertNotEqual(membership[0], membership[5])
+
+    def test_refine_splits_disconnected_community(self):
+        # two triangles put in the same community
+        graph = as_csr(nx.Graph([(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3)]))
+        membership = np.zeros(6, dtype=np.int32)
+        refined = Leiden._refine(graph, membership, 1.0, np.random.default_rng(0))
+        self.assertTrue(set(refined[:3].tolist()).isdisjoint(refined[3:].tolist()))
+        self.assertLess(len(set(refined.tolist())), 6)
+
+    def test_identification(self):
+        partition = [list(range(i, 600, 4)) for i in range(4)]
+        graph = GraphGeneration.generate_erdos_p_partition_model_fast(
+            partition, 0.1, 0.002, csr=True, rng=np.random.default_rng(0))
+        result = Leiden.identification(graph, seed=0)
+        self.assertEqual(len(result), 600)
+        self.assertEqual(sorted(set(result)), list(range(4)))
+        for group in partition:
+            self.assertEqual(len({result[node] for node in group}), 1)
+
+    def test_connected_communities(self):
+        graphs = [GraphGeneration.erdos_graph_m_fast(2000, 6000, csr=True, rng=np.random.default_rng(seed))
+                  for seed in range(3)]
+        graphs += [as_csr(nx.barabasi_albert_graph(1000, 2, seed=0)), as_csr(nx.karate_club_graph())]
+        for graph in graphs:
+            networkx_graph = graph.to_networkx()
+            for seed in range(3):
+                result = np.array(Leiden.identification(graph, seed=seed))
+                for community in np.unique(result):
+                    self.assertTrue(nx.is_connected(
+                        networkx_graph.subgraph(np.flatnonzero(result == community).tolist())))
+
+    def test_split_disconnected(self):
+        # two triangles put in the same community
+        graph = as_csr(nx.Graph([(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3), (2, 3)]))
+        membership = np.array([0, 0, 1, 1, 1, 0], dtype=np.int32)
+        self.assertEqual(Leiden._split_disconnected(graph, membership).tolist(), [0, 0, 1, 1, 1, 2])
+
+    def test_modularity(self):
+        graph = nx.karate_club_graph()
+        scores = []
+        for algorithm in (Leiden, FastLouvain):
+            result = algorithm.identification(graph, seed=1)
+            communities = [{node for node, label in enumerate(result) if label == community}
+                           for community in set(result)]
+            scores.append(nx.community.modularity(graph, communities))
+        self.assertGreater(scores[0], scores[1] - 0.02)
+
+    def test_edgeless(self):
+        self.assertEqual(Leiden.identification(CSRGraph.from_edges(3, np.empty((0, 2)))), [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
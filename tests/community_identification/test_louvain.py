@@ -2,6 +2,7 @@ import random
 import networkx as nx
 import unittest
 from logic.community_identification.louvain import Louvain
+from logic.csr_graph import CSRGraph
 
 
 class TestCommunityIdentification(unittest.TestCase):
@@ -35,6 +36,28 @@ class TestCommunityIdentification(unittest.TestCase):
         self.assertIsInstance(new_partition, dict)
         self.assertIsInstance(improved, bool)
 
+    def test_one_level_queue(self):
+        random.seed(0)
+        graph = nx.Graph([(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3), (2, 3)])
+        stats = {}
+        partition, improved = Louvain._one_level(
+            graph, Louvain._init_partition(graph), resolution=1.0, queue=True, stats=stats)
+        self.assertTrue(improved)
+        self.assertEqual(partition[0], partition[1])
+        self.assertEqual(partition[4], partition[5])
+        self.assertNotEqual(partition[0], partition[5])
+        self.assertEqual(stats["full_sweep_visits"], 6 * stats["sweeps"])
+        self.assertEqual(stats["saved_visits"], stats["full_sweep_visits"] - stats["visits"])
+        self.assertGreater(stats["saved_visits"], 0)
+
+    def test_one_level_max_sweeps(self):
+        random.seed(0)
+        graph = nx.path_graph(20)
+        stats = {}
+        Louvain._one_level(graph, Louvain._init_partition(graph), resolution=1.0,
+                           max_sweeps=1, stats=stats)
+        self.assertEqual(stats, {"sweeps": 1, "visits": 20, "full_sweep_visits": 20, "saved_visits": 0})
+
     def test_aggregate_graph(self):
         graph = nx.Graph()
         graph.add_edge(0, 1, weight=2)
@@ -45,6 +68,23 @@ class TestCommunityIdentification(unittest.TestCase):
         edge_data = list(new_graph.edges(data=True))[0][2]
         self.assertEqual(edge_data['weight'], 2)
 
+    def test_aggregate_graph_self_loops(self):
+        graph = nx.Graph()
+        graph.add_edge(0, 1, weight=2.0)
+        graph.add_edge(1, 1, weight=3.0)
+        graph.add_edges_from([(1, 2), (2, 3)])
+        partition = {0: 0, 1: 0, 2: 1, 3: 1}
+        new_graph, mapping = Louvain._aggregate_graph(graph, partition)
+        self.assertEqual(new_graph[0][0]['weight'], 5.0)
+        self.assertEqual(new_graph[0][1]['weight'], 1.0)
+        self.assertEqual(new_graph[1][1]['weight'], 1.0)
+        # the degrees of the communities are the sums of the degrees of their nodes
+        self.assertEqual(dict(new_graph.degree(weight='weight')), {0: 11.0, 1: 3.0})
+
+        csr = CSRGraph.from_networkx(graph)
+        new_csr, _ = Louvain._aggregate_graph(csr, partition)
+        self.assertEqual(new_csr.weighted_degrees().tolist(), [11.0, 3.0])
+
     def test_louvain_output(self):
         graph = nx.Graph()
         graph.add_edges_from([(0, 1), (1, 2), (2, 0), (2, 3)])
@@ -52,6 +92,25 @@ class TestCommunityIdentification(unittest.TestCase):
         self.assertIsInstance(result, list)
         self.assertEqual(len(result), graph.number_of_nodes())
 
+    def test_louvain_csr_input(self):
+        random.seed(42)
+        graph = nx.Graph()
+        graph.add_edges_from([(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3), (2, 3)])
+        csr = CSRGraph.from_networkx(graph)
+        result = Louvain.identification(csr, resolution=1.0)
+        self.assertEqual(len(result), 6)
+        self.assertEqual(result[0], result[1])
+        self.assertEqual(result[4], result[5])
+
+    def test_louvain_queue(self):
+        random.seed(1)
+        graph = nx.Graph([(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3), (2, 3)])
+        stats = {}
+        result = Louvain.identification(graph, queue=True, min_gain=1e-9, stats=stats)
+        self.assertEqual(result[0], result[1])
+        self.assertEqual(result[4], result[5])
+        self.assertLessEqual(stats["visits"], stats["full_sweep_visits"])
+
 
 if __name__ == '__main__':
     unittest.main()
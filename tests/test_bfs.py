@@ -1,5 +1,9 @@
-from logic.bfs import bfs
+from logic.bfs import bfs, bfs_distances, bfs_restricted, bidirectional_bfs
+import numpy as np
+from logic.graph_generation import GraphGeneration
 import networkx as nx
+import time
+from logic.csr_graph import CSRGraph
 
 
 class TestBFS:
@@ -24,3 +28,66 @@ class TestBFS:
             4: 2,
             5: 2,
             6: 2})
+
+    def test_bfs_distances_parents(self):
+        graph = nx.Graph([(0, 1), (0, 2), (1, 3), (2, 3), (3, 4), (5, 6)])
+        distances, parents = bfs_distances(graph, 0, return_parents=True)
+        assert distances.dtype == np.int32
+        assert distances.tolist() == [0, 1, 1, 2, 3, -1, -1]
+        assert parents[0] == 0 and parents[3] in (1, 2) and parents[4] == 3
+        assert parents[5] == -1
+        for node in range(1, 5):
+            assert distances[parents[node]] == distances[node] - 1
+
+    def test_bfs_restricted_early_exit(self):
+        graph = nx.path_graph(10)
+        assert bfs_restricted(graph, 0, {2}) == {0: 0, 1: 1, 2: 2}
+        distances = bfs_distances(graph, 0, destinations={1, 3})
+        assert distances.tolist() == [0, 1, 2, 3] + [-1] * 6
+        assert len(bfs_restricted(graph, 0)) == 10
+
+    def test_long_path(self):
+        # one level per path node: a level must cost O(frontier), not O(n), so isolated nodes
+        # appended to the graph must not slow the BFS down
+        path_length = 2000
+        edges = np.column_stack([np.arange(path_length - 1), np.arange(1, path_length)])
+        elapsed = []
+        for n_nodes in (path_length, 4_000_000):
+            graph = CSRGraph.from_edges(n_nodes, edges)
+            start = time.time()
+            distances = bfs_distances(graph, 0)
+            elapsed.append(time.time() - start)
+            assert distances[path_length - 1] == path_length - 1
+        assert elapsed[1] < 5 * elapsed[0] + 0.1
+
+    def test_direction_optimizing(self):
+        graph = GraphGeneration.erdos_graph_p_fast(
+            300, 0.05, csr=True, rng=np.random.default_rng(0))
+        expected = bfs_distances(graph, 0)
+        distances, parents = bfs_distances(
+            graph, 0, return_parents=True, direction_optimizing=True)
+        assert np.array_equal(distances, expected)
+        reached = distances > 0
+        assert np.all(distances[parents[reached]] == distances[reached] - 1)
+
+    def test_direction_optimizing_early_exit(self):
+        graph = nx.path_graph(10)
+        distances = bfs_distances(graph, 0, destinations={1, 3}, direction_optimizing=True)
+        assert distances.tolist() == [0, 1, 2, 3] + [-1] * 6
+
+    def test_bidirectional_bfs(self):
+        graph = nx.relabel_nodes(nx.disjoint_union(nx.cycle_graph(9), nx.path_graph(2)),
+                                 lambda node: f"n{node}")
+        assert bidirectional_bfs(graph, "n0", "n4") == (4, ["n0", "n1", "n2", "n3", "n4"])
+        assert bidirectional_bfs(graph, "n3", "n3") == (0, ["n3"])
+        assert bidirectional_bfs(graph, "n0", "n9") == (-1, [])
+
+        graph = GraphGeneration.erdos_graph_p_fast(200, 0.015, rng=np.random.default_rng(1))
+        for source in range(0, 200, 7):
+            expected = bfs_distances(graph, source)
+            for target in range(0, 200, 11):
+                distance, path = bidirectional_bfs(graph, source, target)
+                assert distance == expected[target]
+                if distance >= 0:
+                    assert len(path) == distance + 1
+                    assert all(graph.has_edge(u, v) for u, v in zip(path, path[1:]))
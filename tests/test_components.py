@@ -0,0 +1,38 @@
+import networkx as nx
+import numpy as np
+from logic.components import component_members, connected_components, edge_components
+from logic.csr_graph import as_csr
+from logic.graph_generation import GraphGeneration
+
+
+class TestComponents:
+    def test_connected_components(self):
+        graph = nx.Graph([(4, 1), (1, 0), (2, 5), (3, 3)])
+        graph.add_node(6)
+        labels, sizes = connected_components(graph)
+        assert labels.dtype == np.int32 and sizes.dtype == np.int64
+        assert labels.tolist() == [0, 0, 1, 2, 0, 1, 3]
+        assert sizes.tolist() == [3, 2, 1, 1]
+        assert [members.tolist() for members in component_members(labels, sizes)] == \
+            [[0, 1, 4], [2, 5], [3], [6]]
+
+    def test_random_graphs(self):
+        for seed in range(5):
+            graph = GraphGeneration.erdos_graph_p_fast(
+                300, 0.004, csr=True, rng=np.random.default_rng(seed))
+            labels, sizes = connected_components(graph)
+            expected = nx.connected_components(graph.to_networkx())
+            assert sorted(sizes.tolist()) == sorted(len(c) for c in expected)
+            for members in component_members(labels, sizes):
+                assert len(set(labels[members].tolist())) == 1
+
+    def test_edge_components(self):
+        graph = GraphGeneration.erdos_graph_p_fast(
+            500, 0.003, csr=True, rng=np.random.default_rng(0))
+        edges = np.stack([graph.sources(), graph.indices], axis=1)
+        labels, sizes = edge_components(500, np.array_split(edges, 7))
+        expected_labels, expected_sizes = connected_components(graph)
+        assert np.array_equal(labels, expected_labels)
+        assert np.array_equal(sizes, expected_sizes)
+        assert edge_components(0, [])[0].tolist() == []
+        assert component_members(*connected_components(as_csr(nx.Graph()))) == []
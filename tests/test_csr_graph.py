@@ -0,0 +1,52 @@
+import networkx as nx
+import numpy as np
+from logic.csr_graph import CSRGraph, as_csr
+
+
+class TestCSRGraph:
+    def test_from_edges(self):
+        graph = CSRGraph.from_edges(4, np.array([[0, 1], [1, 2], [2, 0], [1, 0]]))
+        assert graph.n_nodes == 4
+        assert graph.n_edges == 3
+        assert list(graph.indptr) == [0, 2, 4, 6, 6]
+        assert list(graph.neighbors(1)) == [0, 2]
+        assert list(graph.degrees()) == [2, 2, 2, 0]
+
+    def test_from_networkx_weighted(self):
+        g = nx.Graph()
+        g.add_edge(0, 1, weight=2.0)
+        g.add_edge(1, 2)
+        g.add_edge(2, 2, weight=3.0)
+        graph = CSRGraph.from_networkx(g)
+        assert graph.n_edges == 3
+        assert graph.total_weight() == 6.0
+        expected = dict(g.degree(weight='weight'))
+        assert dict(zip(graph.nodes, graph.weighted_degrees())) == expected
+        assert dict(zip(graph.nodes, graph.degrees())) == dict(g.degree())
+
+    def test_labels_round_trip(self):
+        g = nx.Graph([("a", "b"), ("b", "c")])
+        graph = as_csr(g)
+        assert list(graph.nodes) == ["a", "b", "c"]
+        assert graph.index_of("c") == 2
+        assert nx.utils.graphs_equal(graph.to_networkx(), g)
+
+    def test_as_csr_is_idempotent(self):
+        graph = as_csr(nx.path_graph(5))
+        assert isinstance(graph.nodes, range)
+        assert as_csr(graph) is graph
+
+    def test_save_and_load(self, tmp_path):
+        path = str(tmp_path / "graph.csr")
+        g = nx.Graph()
+        g.add_edge(10, 20, weight=0.5)
+        g.add_edge(20, 30, weight=2.0)
+        CSRGraph.from_networkx(g).save(path)
+
+        graph = as_csr(path)
+        assert not graph.indices.flags.writeable  # mapped read-only, not copied
+        assert CSRGraph.is_csr_file(path)
+        assert list(graph.nodes) == [10, 20, 30]
+        assert graph.index_of(30) == 2
+        assert nx.utils.graphs_equal(graph.to_networkx(), g)
+        assert list(graph.weighted_degrees()) == [0.5, 2.5, 2.0]
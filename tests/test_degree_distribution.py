@@ -0,0 +1,73 @@
+from collections import Counter
+import networkx as nx
+import numpy as np
+import pytest
+from logic.degree_distribution import DegreeDistribution
+from logic.graph_io import GraphIO
+
+
+class TestDegreeDistribution:
+    def test_exact(self):
+        graph = nx.gnm_random_graph(500, 900, seed=0)
+        graph.add_edge(3, 3)
+        expected = dict(Counter(degree for _, degree in graph.degree()))
+        assert DegreeDistribution.exact(graph) == expected
+
+    def test_restricted_bfs_counts_reached_nodes(self):
+        graph = nx.star_graph(5)
+        assert DegreeDistribution.distribution(graph, 6) == {5: 1, 1: 5}
+
+    def test_streaming(self, tmp_path):
+        graph = nx.gnm_random_graph(500, 900, seed=1)
+        graph.add_edge(7, 7)
+        expected = dict(Counter(degree for _, degree in graph.degree()))
+        edges = np.array(graph.edges())
+        path = tmp_path / "graph.edges"
+        GraphIO.write_edge_chunks(path, [edges[:400], edges[400:]])
+
+        assert DegreeDistribution.streaming(path, n_nodes=500, chunk_size=128) == expected
+        expected.pop(0, None)
+        assert DegreeDistribution.streaming(path, chunk_size=128) == expected
+
+    def test_estimate(self):
+        graph = nx.barabasi_albert_graph(20000, 3, seed=0)
+        exact = DegreeDistribution.exact(graph)
+        for method in ("uniform", "random_walk", "bfs"):
+            distribution, intervals, n_samples = DegreeDistribution.estimate(
+                graph, method, budget=20000, rng=np.random.default_rng(0))
+            assert n_samples == 20000
+            assert abs(distribution[3] / exact[3] - 1) < 0.15
+            low, high = intervals[3]
+            assert low <= distribution[3] <= high
+
+    def test_estimate_reached_components(self):
+        graph = nx.barabasi_albert_graph(5000, 3, seed=0)
+        graph.add_nodes_from(range(5000, 7000))
+        exact = DegreeDistribution.exact(graph)
+        for method in ("random_walk", "bfs"):
+            distribution, _, _ = DegreeDistribution.estimate(
+                graph, method, budget=20000, rng=np.random.default_rng(0), n_nodes=5000)
+            # the isolated nodes are neither sampled nor counted
+            assert 0 not in distribution
+            assert abs(sum(distribution.values()) - 5000) < 1e-6
+            assert abs(distribution[3] / exact[3] - 1) < 0.15
+
+    def test_estimate_edgeless(self):
+        graph = nx.empty_graph(10)
+        for method in ("random_walk", "bfs"):
+            assert DegreeDistribution.estimate(graph, method) == ({0: 10.0}, {0: (10.0, 10.0)}, 0)
+            assert DegreeDistribution.estimate(graph, method, n_nodes=4) == ({0: 4.0}, {0: (4.0, 4.0)}, 0)
+
+    def test_estimate_stopping_rule(self):
+        graph = nx.gnm_random_graph(5000, 10000, seed=0)
+        _, intervals, n_samples = DegreeDistribution.estimate(
+            graph, budget=10 ** 6, tolerance=0.02, batch_size=500, rng=np.random.default_rng(1))
+        assert n_samples < 10 ** 6 and n_samples % 500 == 0
+        assert all((high - low) / 2 <= 0.02 * 5000 for low, high in intervals.values())
+        with pytest.raises(ValueError):
+            DegreeDistribution.estimate(graph, "snowball")
+
+    def test_tail_exponent(self):
+        degrees = np.arange(1, 10 ** 5)
+        distribution = dict(zip(degrees.tolist(), (1e9 * degrees ** -2.5).tolist()))
+        assert abs(DegreeDistribution.tail_exponent(distribution, 5) - 2.5) < 0.05
@@ -0,0 +1,84 @@
+import gc
+import networkx as nx
+import numpy as np
+import pytest
+from logic.csr_graph import as_csr
+from logic.graph_cache import GraphCache, graph_cache, invalidate
+
+
+class TestGraphCache:
+    def test_hit_and_invalidate(self):
+        cache = GraphCache()
+        graph = as_csr(nx.path_graph(4))
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return np.arange(graph.n_edges)
+
+        assert cache.get(graph, "edges", compute).tolist() == [0, 1, 2]
+        assert cache.get(graph, "edges", compute).tolist() == [0, 1, 2]
+        assert len(calls) == 1
+        with pytest.raises(ValueError):
+            cache.get(graph, "edges", compute)[0] = 5
+
+        cache.invalidate(graph)
+        cache.get(graph, "edges", compute)
+        assert len(calls) == 2
+
+    def test_networkx_graph_is_not_cached(self):
+        cache = GraphCache()
+        graph = nx.path_graph(4)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return np.arange(graph.number_of_edges())
+
+        assert cache.get(graph, "edges", compute).tolist() == [0, 1, 2]
+        graph.add_edge(3, 4)
+        assert cache.get(graph, "edges", compute).tolist() == [0, 1, 2, 3]
+        assert len(calls) == 2 and len(cache) == 0
+
+    def test_lru_eviction(self):
+        cache = GraphCache(max_bytes=2000)
+        graph = as_csr(nx.path_graph(3))
+        for key in range(5):
+            cache.get(graph, key, lambda: np.zeros(100))
+        assert len(cache) == 2 and cache.n_bytes == 1600
+        # 3 becomes the most recently used, 4 is evicted
+        cache.get(graph, 3, lambda: "recomputed")
+        cache.get(graph, 5, lambda: np.zeros(100))
+        assert len(cache) == 2
+        assert isinstance(cache.get(graph, 3, lambda: "recomputed"), np.ndarray)
+        assert cache.get(graph, 4, lambda: "recomputed") == "recomputed"
+
+    def test_collected_graph(self):
+        cache = GraphCache()
+        graph = as_csr(nx.path_graph(3))
+        cache.get(graph, "key", lambda: np.zeros(10))
+        del graph
+        gc.collect()
+        assert len(cache) == 0 and cache.n_bytes == 0
+        assert cache.get("graph.csr", "key", lambda: 1) == 1 and len(cache) == 0
+
+    def test_as_csr_follows_changes(self):
+        graph = nx.cycle_graph(5)
+        csr = as_csr(graph)
+        assert as_csr(csr) is csr
+        assert csr.degrees() is csr.degrees()
+
+        # re-weighting and rewiring keep the node and edge counts
+        graph[0][1]["weight"] = 3.0
+        assert as_csr(graph).weights is not None and as_csr(graph).weighted_degrees()[0] == 4.0
+        graph.remove_edge(2, 3)
+        graph.add_edge(0, 2)
+        assert 2 in as_csr(graph).neighbors(0) and 3 not in as_csr(graph).neighbors(2)
+
+    def test_invalidate(self):
+        graph = as_csr(nx.cycle_graph(5))
+        degrees = graph.degrees()
+        invalidate(graph)
+        assert graph.degrees() is not degrees and graph.degrees().tolist() == degrees.tolist()
+        invalidate()
+        assert len(graph_cache) == 0
@@ -1,6 +1,14 @@
 from typing import Dict, List
 import networkx as nx
-from logic.graph_diameter import double_bfs, graph_diameter
+import numpy as np
+import pytest
+from logic.bfs import multi_source_bfs
+from logic.graph_cache import graph_cache
+from logic import graph_diameter as graph_diameter_module
+from logic.graph_generation import GraphGeneration
+from logic.graph_diameter import approximate_distance_distribution, average_distance, center, closeness_centrality, \
+    diameter_bounds, distance_distribution, double_bfs, eccentricities, effective_diameter, \
+    exact_diameter, graph_diameter, neighbourhood_function, periphery, radius
 
 VERBOSE = True
 
@@ -11,6 +19,7 @@ class TestGraphDiameter:
         graph = nx.Graph(graph_dict)
         diameter = graph_diameter(graph)
         double_bfs_diameter = double_bfs(graph)
+        bounded_diameter, n_bfs = exact_diameter(graph)
 
         if VERBOSE:
             print(
@@ -18,6 +27,8 @@ class TestGraphDiameter:
 
         assert diameter == expected
         assert diameter == double_bfs_diameter
+        assert bounded_diameter == expected
+        assert 1 <= n_bfs <= graph.number_of_nodes()
 
     def test_0(self):
         TestGraphDiameter.run_a_graph_test(3, {
@@ -43,3 +54,116 @@ class TestGraphDiameter:
             2: [0, 1, 3],
             3: [0, 1, 2]
         })
+
+    def test_distance_distribution(self):
+        graph = nx.path_graph(4)
+        assert distance_distribution(graph).tolist() == [4, 6, 4, 2]
+
+    def test_closeness_centrality(self):
+        graph = nx.Graph([(0, 1), (1, 2), (2, 3), (3, 0), (3, 4), (5, 6)])
+        expected = nx.closeness_centrality(graph)
+        closeness = closeness_centrality(graph)
+        for node in graph:
+            assert abs(closeness[node] - expected[node]) < 1e-12
+
+    def test_multi_source_bfs_batches(self):
+        graph = nx.cycle_graph(150)
+        eccentricities, distance_sums, reached, _ = multi_source_bfs(graph, words=2)
+        assert eccentricities.tolist() == [75] * 150
+        assert distance_sums.tolist() == [75 * 75] * 150
+        assert reached.tolist() == [150] * 150
+        assert graph_diameter(graph) == 75
+
+    def test_exact_diameter_random(self):
+        for seed in range(10):
+            graph = GraphGeneration.erdos_graph_p_fast(
+                120, 0.02, csr=True, rng=np.random.default_rng(seed))
+            diameter, n_bfs = exact_diameter(graph)
+            assert diameter == graph_diameter(graph)
+            assert n_bfs < graph.n_nodes
+
+    def test_bounding_bfs_not_cached(self):
+        graph = GraphGeneration.erdos_graph_p_fast(300, 0.01, csr=True, rng=np.random.default_rng(0))
+        _, n_bfs = exact_diameter(graph)
+        eccentricities(graph)
+        diameter_bounds(graph, max_bfs=10)
+        cached = [key for graph_id, key in graph_cache._entries
+                  if graph_id == id(graph) and isinstance(key, tuple) and key[0] == "bfs"]
+        assert n_bfs > 1 and len(cached) <= 1
+
+    def test_diameter_bounds_distinct_sources(self, monkeypatch):
+        sources = []
+        bfs = graph_diameter_module._bfs
+
+        def recording_bfs(graph, source, cache=False):
+            sources.append(source)
+            return bfs(graph, source, cache)
+
+        monkeypatch.setattr(graph_diameter_module, "_bfs", recording_bfs)
+        graph = nx.cycle_graph(40)
+        for sweep in (2, 4):
+            sources.clear()
+            lower, upper, n_bfs = diameter_bounds(graph, max_bfs=12, sweep=sweep)
+            assert (lower, upper) == (20, 20) or n_bfs == 12
+            assert len(sources) == n_bfs and len(set(sources)) == n_bfs
+
+    def test_exact_diameter_disconnected(self):
+        graph = nx.disjoint_union(nx.path_graph(3), nx.path_graph(6))
+        assert exact_diameter(graph)[0] == 5
+
+    def test_eccentricities_per_component(self):
+        graph = nx.disjoint_union(nx.path_graph(5), nx.star_graph(3))
+        graph.add_node(9)
+        ecc, components, n_bfs = eccentricities(graph)
+        assert ecc.tolist() == [4, 3, 2, 3, 4, 1, 2, 2, 2, 0]
+        assert len(set(components.tolist())) == 3
+        assert n_bfs < graph.number_of_nodes()
+
+    def test_eccentricities_random(self):
+        for seed in range(5):
+            graph = GraphGeneration.erdos_graph_p_fast(
+                100, 0.03, rng=np.random.default_rng(seed))
+            ecc, _, _ = eccentricities(graph)
+            for component in nx.connected_components(graph):
+                expected = nx.eccentricity(graph.subgraph(component))
+                assert all(ecc[node] == expected[node] for node in component)
+
+    def test_radius_center_periphery(self):
+        graph = nx.disjoint_union(nx.path_graph(5), nx.star_graph(3))
+        components = eccentricities(graph)[1]
+        radii = radius(graph)
+        assert radii[components[0]] == 2 and radii[components[5]] == 1
+        assert center(graph).tolist() == [2, 5]
+        assert periphery(graph).tolist() == [0, 4, 6, 7, 8]
+
+    def test_diameter_bounds(self):
+        assert diameter_bounds(nx.path_graph(31)) == (30, 30, 3)
+        # every node of the path is used once, then the sweeps stop
+        lower, upper, n_bfs = diameter_bounds(
+            nx.disjoint_union(nx.star_graph(3), nx.path_graph(8)), max_bfs=10)
+        assert lower == 7 and upper == 8 and n_bfs == 8
+        for seed in range(5):
+            graph = GraphGeneration.erdos_graph_p_fast(
+                200, 0.012, rng=np.random.default_rng(seed))
+            expected = exact_diameter(graph)[0]
+            for sweep in (2, 4):
+                lower, upper, n_bfs = diameter_bounds(graph, max_bfs=20, sweep=sweep)
+                assert lower <= expected <= upper and n_bfs <= 20
+
+    def test_effective_diameter_average_distance(self):
+        distribution = distance_distribution(nx.path_graph(4))
+        assert np.isclose(effective_diameter(distribution), 2.4)
+        assert np.isclose(average_distance(distribution),
+                          nx.average_shortest_path_length(nx.path_graph(4)))
+
+    def test_hyper_anf(self):
+        graph = nx.disjoint_union(nx.path_graph(40), nx.star_graph(20))
+        exact = distance_distribution(graph)
+        approximate = approximate_distance_distribution(graph, precision=12)
+        assert len(approximate) == len(exact)
+        assert np.all(np.diff(neighbourhood_function(graph, precision=12)) >= 0)
+        assert abs(approximate.sum() / exact.sum() - 1) < 0.1
+        assert abs(average_distance(approximate) / average_distance(exact) - 1) < 0.1
+        assert len(neighbourhood_function(graph, max_distance=3)) == 4
+        with pytest.raises(ValueError):
+            neighbourhood_function(graph, precision=3)
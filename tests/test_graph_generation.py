@@ -0,0 +1,65 @@
+import networkx as nx
+import numpy as np
+from logic.csr_graph import CSRGraph
+from logic.graph_generation import GraphGeneration
+from logic.node_partition import NodePartition
+
+
+class TestGraphGeneration:
+    def test_partition_model_fast_extremes(self):
+        partition = NodePartition.partition_list(12, 3, as_set=False)
+        graph = GraphGeneration.generate_erdos_p_partition_model_fast(
+            partition, p=1.0, q=0.0, rng=np.random.default_rng(0))
+        assert graph.number_of_nodes() == 12
+        assert graph.number_of_edges() == 3 * 6
+        for group in partition:
+            for u in group:
+                assert set(graph.neighbors(u)) == set(group) - {u}
+
+    def test_partition_model_fast_csr(self):
+        partition = NodePartition.partition_list(200, 4, as_set=False)
+        graph = GraphGeneration.generate_erdos_p_partition_model_fast(
+            partition, p=0.5, q=0.05, csr=True, rng=np.random.default_rng(0))
+        assert isinstance(graph, CSRGraph)
+        assert graph.n_nodes == 200
+        expected = 4 * (50 * 49 // 2) * 0.5 + 6 * 50 * 50 * 0.05
+        assert abs(graph.n_edges - expected) < 0.1 * expected
+        assert np.all(graph.sources() != graph.indices)
+
+    def test_erdos_graph_m_fast(self):
+        graph = GraphGeneration.erdos_graph_m_fast(
+            50, 300, rng=np.random.default_rng(0))
+        assert graph.number_of_nodes() == 50
+        assert graph.number_of_edges() == 300
+        assert nx.number_of_selfloops(graph) == 0
+
+    def test_erdos_graph_m_fast_complete(self):
+        graph = GraphGeneration.erdos_graph_m_fast(
+            10, 45, csr=True, rng=np.random.default_rng(0))
+        assert graph.n_edges == 45
+
+    def test_erdos_graph_p_fast(self):
+        rng = np.random.default_rng(0)
+        assert GraphGeneration.erdos_graph_p_fast(
+            20, 1.0, rng=rng).number_of_edges() == 190
+        assert GraphGeneration.erdos_graph_p_fast(
+            20, 0.0, rng=rng).number_of_edges() == 0
+        graph = GraphGeneration.erdos_graph_p_fast(
+            400, 0.1, csr=True, rng=rng)
+        expected = 400 * 399 / 2 * 0.1
+        assert abs(graph.n_edges - expected) < 0.1 * expected
+
+    def test_partition_m_model(self):
+        partition = NodePartition.partition_list(30, 3, as_set=False)
+        graph = GraphGeneration.generate_erdos_m_partition_model(
+            partition, m_edges=20, q=0.0, rng=np.random.default_rng(0))
+        assert graph.number_of_nodes() == 30
+        assert graph.number_of_edges() == 3 * 20
+        for group in partition:
+            assert graph.subgraph(group).number_of_edges() == 20
+
+    def test_partition_m_model_saturated(self):
+        partition = NodePartition.partition_list(12, 3, as_set=False)
+        graph = GraphGeneration.generate_erdos_m_partition_model(
+            partition, m_edges=100, q=1.0, csr=True, rng=np.random.default_rng(0))
+        assert graph.n_edges == 12 * 11 // 2
@@ -0,0 +1,90 @@
+import subprocess
+import sys
+import numpy as np
+from logic.bfs import bfs
+from logic.graph_generation import GraphGeneration
+from logic import graph_io
+from logic.graph_io import GraphIO
+from logic.node_partition import NodePartition
+
+
+class TestGraphIO:
+    def test_stream_partition_model_chunks(self):
+        partition = NodePartition.partition_list(60, 3, as_set=False)
+        chunks = list(GraphGeneration.stream_erdos_p_partition_model(
+            partition, p=1.0, q=0.0, chunk_size=100, rng=np.random.default_rng(0)))
+        assert [len(chunk) for chunk in chunks] == [100] * 5 + [70]
+        edges = np.concatenate(chunks)
+        membership = NodePartition.partition_list_to_partition_nodes(partition)
+        assert all(membership[u] == membership[v] for u, v in edges)
+
+    def test_stream_erdos_graph_p(self):
+        edges = np.concatenate(list(GraphGeneration.stream_erdos_graph_p(
+            30, 1.0, chunk_size=64, rng=np.random.default_rng(0))))
+        assert len(edges) == 30 * 29 // 2
+        assert len({(u, v) for u, v in edges.tolist()}) == len(edges)
+
+    def test_write_and_read_edge_chunks(self, tmp_path):
+        path = str(tmp_path / "graph.edges")
+        chunks = GraphGeneration.stream_erdos_graph_p(
+            200, 0.1, chunk_size=128, rng=np.random.default_rng(0))
+        n_edges = GraphIO.write_edge_chunks(path, chunks)
+        assert GraphIO.count_edges(path) == n_edges
+
+        n_more = GraphIO.write_edge_chunks(path, [np.array([[0, 1]])], append=True)
+        assert GraphIO.count_edges(path) == n_edges + n_more
+
+        read = list(GraphIO.read_edge_chunks(path, chunk_size=100))
+        assert all(len(chunk) == 100 for chunk in read[:-1])
+        assert sum(len(chunk) for chunk in read) == n_edges + 1
+        assert read[-1][-1].tolist() == [0, 1]
+
+    def test_convert_edgelist(self, tmp_path):
+        text_path = tmp_path / "graph.txt"
+        text_path.write_text("# comment\n5 7\n7 9\n9 5\n9 11\n")
+        graph = GraphIO.convert_edgelist(str(text_path), str(tmp_path / "graph.csr"))
+        assert list(graph.nodes) == [5, 7, 9, 11]
+        assert graph.n_edges == 4
+        assert list(graph.degrees()) == [2, 2, 3, 1]
+        assert bfs(str(tmp_path / "graph.csr"), 5) == {5: 0, 7: 1, 9: 1, 11: 2}
+
+    def test_read_edgelist_parallel(self, tmp_path, monkeypatch):
+        rng = np.random.default_rng(0)
+        raw = rng.integers(0, 10**12, size=(500, 2))
+        text_path = tmp_path / "graph.txt"
+        text_path.write_text(
+            "# u v w\n" + "".join(f"{u} {v} {i / 10}\n" for i, (u, v) in enumerate(raw)))
+
+        expected = GraphIO.read_edgelist(str(text_path), n_workers=1)
+        monkeypatch.setattr(graph_io, "PARALLEL_MIN_BYTES", 100)
+        node_ids, edges, weights = GraphIO.read_edgelist(str(text_path), n_workers=3)
+        assert edges.dtype == np.int32
+        assert np.array_equal(node_ids, expected[0])
+        assert np.array_equal(edges, expected[1])
+        assert np.array_equal(node_ids[edges], raw)
+        assert np.allclose(weights, np.arange(500) / 10)
+
+    def test_read_edgelist_parallel_after_numba_threads(self, tmp_path):
+        # the process pool used to be forked after numba's thread pool started, and the
+        # interpreter then never exited
+        text_path = tmp_path / "graph.txt"
+        text_path.write_text("".join(f"{i} {i + 1}\n" for i in range(200)))
+        script = f"""
+import networkx as nx
+from logic import graph_io
+from logic.community_identification.fast_louvain import FastLouvain
+from logic.graph_io import GraphIO
+FastLouvain.identification(nx.karate_club_graph(), seed=0, n_workers=2)
+graph_io.PARALLEL_MIN_BYTES = 100
+print(len(GraphIO.read_edgelist({str(text_path)!r}, n_workers=3)[1]))
+"""
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == ["200"]
+
+    def test_translate_labels(self, tmp_path):
+        text_path = tmp_path / "graph.txt"
+        text_path.write_text("100 200\n200 300\n")
+        graph = GraphIO.load_edgelist(str(text_path))
+        labels = [0, 0, 1]
+        assert GraphIO.translate_labels(graph.nodes, labels) == {100: 0, 200: 0, 300: 1}
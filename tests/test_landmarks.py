@@ -0,0 +1,58 @@
+import networkx as nx
+import numpy as np
+import pytest
+from logic.bfs import bfs_distances
+from logic.csr_graph import as_csr
+from logic.graph_generation import GraphGeneration
+from logic.landmarks import LandmarkIndex
+
+
+class TestLandmarkIndex:
+    def test_bounds_and_queries(self):
+        graph = GraphGeneration.erdos_graph_p_fast(
+            300, 0.008, csr=True, rng=np.random.default_rng(0))
+        for strategy in ("degree", "random"):
+            index = LandmarkIndex.build(graph, 8, strategy, np.random.default_rng(1))
+            assert index.distances.dtype == np.uint8
+            for source in range(0, 300, 13):
+                expected = bfs_distances(graph, source)
+                for target in range(0, 300, 17):
+                    lower, upper = index.bounds(source, target)
+                    if expected[target] < 0:
+                        assert index.query(source, target) == (-1, [])
+                        continue
+                    assert lower <= expected[target]
+                    assert upper is None or expected[target] <= upper
+                    distance, path = index.query(source, target)
+                    assert distance == index.distance(source, target) == expected[target]
+                    assert path[0] == source and path[-1] == target
+                    assert all(target in graph.neighbors(source) or source == target
+                               for source, target in zip(path, path[1:]))
+
+    def test_deep_graph_uses_uint16(self):
+        index = LandmarkIndex.build(as_csr(nx.path_graph(600)), 2, "random")
+        assert index.distances.dtype == np.uint16
+        assert index.distance(0, 599) == 599
+
+    def test_graph_like(self, tmp_path):
+        graph = nx.relabel_nodes(nx.cycle_graph(12), {i: f"n{i}" for i in range(12)})
+        index = LandmarkIndex.build(graph, 2)
+        assert index.query("n0", "n3") == (3, ["n0", "n1", "n2", "n3"])
+        as_csr(nx.path_graph(6)).save(tmp_path / "path.csr")
+        index = LandmarkIndex.build(tmp_path / "path.csr", 2)
+        assert index.distance(0, 5) == 5
+        index.save(tmp_path / "path.landmarks")
+        assert LandmarkIndex.load(tmp_path / "path.landmarks", tmp_path / "path.csr").distance(5, 1) == 4
+
+    def test_save_load(self, tmp_path):
+        graph = as_csr(nx.disjoint_union(nx.cycle_graph(20), nx.path_graph(5)))
+        index = LandmarkIndex.build(graph, 3)
+        index.save(tmp_path / "graph.landmarks")
+        loaded = LandmarkIndex.load(tmp_path / "graph.landmarks", graph)
+        assert np.array_equal(loaded.landmarks, index.landmarks)
+        assert np.array_equal(loaded.distances, index.distances)
+        assert loaded.query(0, 10) == index.query(0, 10) == (10, list(range(11)))
+        with pytest.raises(ValueError):
+            LandmarkIndex.load(tmp_path / "graph.landmarks", as_csr(nx.path_graph(3)))
+        with pytest.raises(ValueError):
+            LandmarkIndex.build(graph, 3, "central")